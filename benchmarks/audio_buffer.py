@@ -0,0 +1,65 @@
+"""Callback time and peak allocated memory for the old list+concatenate path vs. the capture buffer."""
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.audio_buffer import AudioCaptureBuffer
+from src.config import SAMPLERATE
+
+BLOCK_FRAMES = 512 # Typical PortAudio block size at 16 kHz
+
+
+def run_list(blocks):
+    recording_data = []
+    timings = []
+    for block in blocks:
+        start = time.perf_counter()
+        recording_data.append(block.copy())
+        timings.append(time.perf_counter() - start)
+    audio = np.concatenate(recording_data, axis=0)
+    return timings
+
+
+def capture(blocks):
+    buffer = AudioCaptureBuffer()
+    timings = []
+    for block in blocks:
+        start = time.perf_counter()
+        buffer.write(block)
+        timings.append(time.perf_counter() - start)
+    return buffer.detach(), timings
+
+
+def run_joined(blocks):
+    recording, timings = capture(blocks)
+    audio = recording.to_array()
+    return timings
+
+
+def run_segments(blocks):
+    recording, timings = capture(blocks)
+    sum(len(segment) for segment in recording.segments())
+    return timings
+
+
+def measure(runner, seconds):
+    block = (np.random.randn(BLOCK_FRAMES, 1) * 1000).astype(np.int16)
+    blocks = [block] * (seconds * SAMPLERATE // BLOCK_FRAMES)
+    timings = np.array(runner(blocks)) * 1e6
+    # A second, traced run for the memory peak, so tracing doesn't distort the callback timings.
+    # tracemalloc is portable and sees NumPy's buffers, but counts allocated rather than resident
+    # bytes: lazily mapped zero pages of the preallocated segments count in full.
+    tracemalloc.start()
+    runner(blocks)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return timings.mean(), np.percentile(timings, 99), timings.max(), peak / 1e6
+
+
+for seconds in (10, 60, 600):
+    print(f"{seconds}s recording ({seconds * SAMPLERATE * 2 / 1e6:.1f} MB of samples):")
+    for name, runner in (("list+concatenate", run_list), ("buffer, joined", run_joined), ("buffer, segments", run_segments)):
+        mean, p99, worst, peak = measure(runner, seconds)
+        print(f"  {name:<17} callback mean {mean:5.2f} us, p99 {p99:5.2f} us, max {worst:8.2f} us, "
+              f"peak allocated {peak:6.1f} MB")
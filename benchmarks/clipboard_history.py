@@ -0,0 +1,40 @@
+"""The previous append-and-slice list against the ring, and memory over a long session."""
+import random
+import time
+import tracemalloc
+
+from src.clipboard_history import ClipboardHistory
+
+ENTRIES = 100000
+random.seed(0)
+texts = ["Diktat " + "x" * random.randint(20, 2000) + str(i) for i in range(ENTRIES)]
+
+start = time.perf_counter()
+history_list = ["", ""]
+for text in texts:
+    history_list.append(text)
+    if len(history_list) > 2:
+        history_list = history_list[-2:]
+list_time = time.perf_counter() - start
+
+history = ClipboardHistory(path=None)
+start = time.perf_counter()
+for text in texts:
+    history.add(text)
+ring_time = time.perf_counter() - start
+
+# The texts themselves are allocated up front, so this is what the ring adds on top
+tracemalloc.start()
+traced = ClipboardHistory(path=None)
+for text in texts:
+    traced.add(text)
+_, peak = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+assert history.nbytes <= history.max_bytes and len(history) <= history.capacity
+
+print(f"{ENTRIES} appends: two-item list {list_time / ENTRIES * 1e6:.2f} us each (reaches 1 older entry), "
+      f"ring {ring_time / ENTRIES * 1e6:.2f} us each (reaches {len(history) - 1} older entries)")
+print(f"ring holds {len(history)} entries, {history.nbytes / 1024:.0f} KB of text; "
+      f"peak traced memory while adding {peak / 1024:.0f} KB")
+positions = [history.previous()[1] for _ in range(len(history) + 1)]
+print(f"cycling positions: {positions[:3]} ... {positions[-2:]}")
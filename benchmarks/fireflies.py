@@ -0,0 +1,49 @@
+"""Simulation cost per frame of the previous per-dict loop against the arrays."""
+import time
+
+import numpy as np
+
+from src.fireflies import FireflySwarm
+
+FRAMES = 200
+WIDTH, HEIGHT = 320, 90
+
+
+def dict_frame(fireflies, phase, saturation, value):
+    # The previous animate_background + paintEvent math, without the Qt calls
+    for firefly in fireflies:
+        firefly['x'] += np.sin(phase * firefly['speed_factor'] * 0.1) * 0.1
+        firefly['y'] += np.cos(phase * firefly['speed_factor'] * 0.125) * 0.125
+        if firefly['x'] < -firefly['size']: firefly['x'] = WIDTH + firefly['size']
+        if firefly['x'] > WIDTH + firefly['size']: firefly['x'] = -firefly['size']
+        if firefly['y'] < -firefly['size']: firefly['y'] = HEIGHT + firefly['size']
+        if firefly['y'] > HEIGHT + firefly['size']: firefly['y'] = -firefly['size']
+    for firefly in fireflies:
+        pulse_factor = (np.sin(phase * firefly['speed_factor'] + firefly['phase_offset']) + 1) / 2.0
+        new_s = max(0, min(255, int(saturation * (0.5 + firefly['color_offset'] * 0.5))))
+        new_v = max(0, min(255, int(value * (0.6 + firefly['color_offset'] * 0.4))))
+        alpha = int(255 * (0.3 + pulse_factor * 0.7))
+        current_size = firefly['size'] * (0.5 + pulse_factor * 0.5)
+        int(firefly['x'] - current_size / 2), int(firefly['y'] - current_size / 2), int(current_size), new_s, new_v, alpha
+
+for count in (50, 500, 5000):
+    fireflies = [{
+        'x': np.random.uniform(0, WIDTH),
+        'y': np.random.uniform(0, HEIGHT),
+        'size': np.random.uniform(2, 8),
+        'color_offset': np.random.uniform(0, 1),
+        'phase_offset': np.random.uniform(0, 2 * np.pi),
+        'speed_factor': np.random.uniform(0.5, 1.5)
+    } for _ in range(count)]
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        dict_frame(fireflies, frame * 0.005, 255, 255)
+    dict_time = (time.perf_counter() - start) / FRAMES
+
+    swarm = FireflySwarm(count, WIDTH, HEIGHT)
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        swarm.step(frame * 0.005, WIDTH, HEIGHT)
+        swarm.sprites(frame * 0.005)
+    array_time = (time.perf_counter() - start) / FRAMES
+    print(f"{count:5d} fireflies: dicts {dict_time * 1000:8.3f} ms/frame, arrays {array_time * 1000:6.3f} ms/frame ({dict_time / array_time:5.1f}x)")
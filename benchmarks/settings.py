@@ -0,0 +1,42 @@
+"""Get/set cost of the store against the previous read-modify-write functions."""
+import json
+import os
+import tempfile
+import time
+
+from src.settings import SettingsStore
+
+REPEATS = 2000
+WRITER_THREADS = 8
+
+directory = tempfile.mkdtemp()
+path = os.path.join(directory, 'settings.json')
+with open(path, 'w') as f:
+    json.dump({"elevenlabs_voice_id": "voice", **{f"key{i}": i for i in range(50)}}, f, indent=4)
+
+
+def old_get(key):
+    with open(path, 'r') as f:
+        return json.load(f).get(key)
+
+
+def old_set(key, value):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    data[key] = value
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=4)
+
+test_store = SettingsStore(path, watch_interval=0)
+for name, get, set_ in (("file per call", old_get, old_set), ("in-memory", test_store.get, test_store.set)):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        get("elevenlabs_voice_id")
+    get_time = (time.perf_counter() - start) / REPEATS
+    start = time.perf_counter()
+    for i in range(REPEATS):
+        set_("elevenlabs_voice_id", f"voice{i}")
+    set_time = (time.perf_counter() - start) / REPEATS
+    print(f"{name:13s}: get {get_time * 1e6:8.2f} µs, set {set_time * 1e6:8.2f} µs")
+test_store.flush()
+
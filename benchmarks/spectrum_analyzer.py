@@ -0,0 +1,54 @@
+"""Per-frame cost of the previous update_plot math against the planned analyzer."""
+import time
+
+import numpy as np
+
+from src.spectrum_analyzer import SpectrumAnalyzer
+
+SAMPLE_RATE = 16000
+REPEATS = 300
+
+
+def uncached_spectrum(audio_chunk, chunk_size, sample_rate):
+    # The previous update_plot computation, without the plotting
+    padded_chunk = audio_chunk[:chunk_size]
+    window = np.hanning(len(padded_chunk))
+    fft_result = np.fft.fft(padded_chunk * window)
+    spectrum_magnitude = np.abs(fft_result[:len(fft_result)//2])
+    spectrum_db = 20 * np.log10(spectrum_magnitude + 1e-9)
+    frequencies = np.fft.fftfreq(len(fft_result), 1/sample_rate)[:len(fft_result)//2]
+    normalized_frequencies = frequencies / (sample_rate / 2)
+    weighting_curve = np.exp(normalized_frequencies * np.log(100.0 / 0.001)) * 0.001
+    spectrum_db = 20 * np.log10(spectrum_magnitude * weighting_curve + 1e-9)
+    valid_indices = frequencies >= 80
+    return frequencies[valid_indices], spectrum_db[valid_indices]
+
+for chunk_size in (1024, 2048, 4096, 8192, 16384):
+    audio = np.random.randn(chunk_size * 4) * 1000
+    analyzer = SpectrumAnalyzer(SAMPLE_RATE, chunk_size)
+    expected = uncached_spectrum(audio, chunk_size, SAMPLE_RATE)[1]
+    assert np.allclose(analyzer.analyze(audio[:chunk_size]), expected)
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        uncached_spectrum(audio, chunk_size, SAMPLE_RATE)
+    uncached_time = (time.perf_counter() - start) / REPEATS
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        analyzer.analyze(audio[:chunk_size])
+    planned_time = (time.perf_counter() - start) / REPEATS
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        analyzer.analyze_frames(audio)
+    welch_time = (time.perf_counter() - start) / REPEATS
+    # What band mode adds per frame on top of the spectrum it already has
+    magnitude = analyzer.magnitude(audio)
+    assert np.allclose(analyzer.band_db(magnitude), analyzer.analyze_bands(audio))
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        analyzer.band_db(magnitude)
+    band_time = (time.perf_counter() - start) / REPEATS
+    frames = len(range(0, len(audio) - chunk_size + 1, analyzer.hop))
+    print(f"{chunk_size:5d} points: fft {uncached_time * 1000:6.3f} ms, planned rfft {planned_time * 1000:6.3f} ms "
+          f"({uncached_time / planned_time:4.1f}x), Welch over {frames} frames {welch_time * 1000:6.3f} ms, "
+          f"bands +{band_time * 1000:6.3f} ms ({len(analyzer.frequencies)} -> {len(analyzer.band_frequencies)} points)")
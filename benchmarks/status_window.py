@@ -0,0 +1,67 @@
+"""Paint time per frame of the previous per-firefly drawing against the cached rendering. Runs without
+a display with QT_QPA_PLATFORM=offscreen."""
+import sys
+import time
+
+from PyQt5 import QtWidgets, QtGui, QtCore
+
+from src.status_window import StatusWindow, IDLE_FIREFLY_COLOR
+
+FRAMES = 200
+
+
+class UncachedStatusWindow(StatusWindow):
+    def paintEvent(self, event):
+        # The previous paintEvent: gradient, getHsv/fromHsv and one drawEllipse per firefly, every frame
+        start = time.perf_counter()
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        gradient = QtGui.QRadialGradient(self.width() / 2, self.height() / 2, max(self.width(), self.height()) / 2)
+        gradient.setColorAt(0, QtGui.QColor(0, 0, 0))
+        gradient.setColorAt(1, QtGui.QColor(10, 10, 10))
+        content_rect = self.rect().adjusted(0, self.title_bar.height(), 0, 0)
+        painter.fillRect(content_rect, gradient)
+        painter.setClipRect(content_rect)
+        x, y, diameter, opacity = self.fireflies.sprites(self.animation_phase)
+        for i in range(self.num_fireflies):
+            h, s, v, a = self.current_firefly_color.getHsv()
+            offset = self.fireflies.color_offset[i]
+            color = QtGui.QColor.fromHsv(h, min(255, int(s * (0.5 + offset * 0.5))), min(255, int(v * (0.6 + offset * 0.4))), int(255 * opacity[i]))
+            painter.setBrush(QtGui.QBrush(color))
+            painter.setPen(QtCore.Qt.NoPen)
+            d = int(diameter[i])
+            painter.drawEllipse(int(x[i] - d / 2), int(y[i] - d / 2), d, d)
+        painter.end()
+        self.paint_times.append(time.perf_counter() - start)
+
+app = QtWidgets.QApplication(sys.argv)
+for count in (50, 500, 5000):
+    results = []
+    for window_class in (UncachedStatusWindow, StatusWindow):
+        window = window_class(count)
+        window.animation_timer.stop() # Frames are driven by hand
+        image = QtGui.QImage(window.size(), QtGui.QImage.Format_ARGB32_Premultiplied)
+        for _ in range(FRAMES):
+            window.animate_background()
+            window.render(image, QtCore.QPoint(), QtGui.QRegion(), QtWidgets.QWidget.DrawWindowBackground)
+        results.append(window.average_paint_ms())
+    print(f"{count:5d} fireflies: uncached {results[0]:7.3f} ms/paint, cached {results[1]:7.3f} ms/paint")
+
+# Wakeups and CPU time of the running animation per state
+def run_for(seconds):
+    loop = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+
+window = StatusWindow()
+window.show()
+for label, action in (("idle", lambda: None),
+                      ("recording", lambda: window.set_firefly_color(QtGui.QColor(255, 0, 0))),
+                      ("back to idle", lambda: window.set_firefly_color(IDLE_FIREFLY_COLOR)),
+                      ("hidden", window.hide)):
+    action()
+    run_for(0.5) # Let a colour transition settle first
+    window.animation_stats()
+    run_for(2.0)
+    stats = window.animation_stats()
+    print(f"{label:12s}: {stats['wakeups_per_second']:5.1f} wakeups/s, CPU {stats['cpu_percent']:5.2f} %, interval {stats['interval_ms']} ms")
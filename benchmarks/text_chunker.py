@@ -0,0 +1,46 @@
+"""Chunking speed on long documents and the estimated time to first audio. The latency model (fixed
+request overhead plus synthesis time proportional to the text) is a rough stand-in for the
+non-streaming endpoint; with streaming the difference shrinks but doesn't vanish."""
+import random
+import re
+import time
+
+from src.text_chunker import split_text_into_chunks
+
+REQUEST_OVERHEAD_SECONDS = 0.3
+SYNTHESIS_SECONDS_PER_CHAR = 0.004
+
+
+def greedy_chunks(text, max_chars=500):
+    # The previous splitter, kept here for comparison
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+    chunks = []
+    current_chunk = ""
+    for sentence in sentences:
+        if len(current_chunk) + len(sentence) + 1 <= max_chars:
+            current_chunk += (sentence + " ").strip()
+        else:
+            if current_chunk:
+                chunks.append(current_chunk)
+            current_chunk = (sentence + " ").strip()
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+random.seed(0)
+words = "der die das und ist nicht ein eine mit auf für von sich dem den werden Zeit Jahr Mensch Arbeit Sprache Text Stimme".split()
+
+
+def sentence():
+    clauses = [" ".join(random.choices(words, k=random.randint(4, 12))) for _ in range(random.randint(1, 4))]
+    return ", ".join(clauses).capitalize() + random.choice([".", ".", "!", "?"])
+
+for paragraphs in (10, 100, 1000):
+    document = "\n\n".join(" ".join(sentence() for _ in range(random.randint(2, 8))) for _ in range(paragraphs))
+    for name, splitter in (("greedy", greedy_chunks), ("ramped", split_text_into_chunks)):
+        start = time.perf_counter()
+        chunks = splitter(document)
+        elapsed = time.perf_counter() - start
+        first_audio = REQUEST_OVERHEAD_SECONDS + SYNTHESIS_SECONDS_PER_CHAR * len(chunks[0])
+        print(f"{len(document):8d} chars {name}: {elapsed * 1000:7.2f} ms, {len(chunks):5d} chunks, "
+              f"first {len(chunks[0]):3d} chars (~{first_audio * 1000:4.0f} ms to first audio), longest {max(map(len, chunks))}")
@@ -0,0 +1,38 @@
+"""Search latency over years of synthetic dictations, against scanning a text log."""
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from src.transcript_store import TranscriptStore
+
+ENTRIES = 100000 # About 100 dictations a day for three years
+words = ("Termin Angebot Rechnung Kunde Projekt Besprechung Bericht Entwurf Vertrag Lieferung Frage Antwort bitte danke "
+         "morgen heute nächste Woche Montag Freitag wichtig dringend später senden prüfen ändern").split()
+random.seed(0)
+directory = tempfile.mkdtemp()
+store = TranscriptStore(os.path.join(directory, "transcripts.db"), retention_days=0, legacy_log=None)
+log_path = os.path.join(directory, "transkript_log.txt")
+now = time.time()
+start = time.perf_counter()
+with open(log_path, "w", encoding="utf-8") as log:
+    for i in range(ENTRIES):
+        text = " ".join(random.choices(words, k=random.randint(5, 40)))
+        created_at = now - (ENTRIES - i) * 900
+        store.add(text, duration=random.uniform(1, 30), latency=random.uniform(0.3, 2), created_at=created_at)
+        log.write(f"{datetime.datetime.fromtimestamp(created_at)}: {text}\n\n")
+store.flush()
+print(f"{store.count()} transcripts written in {time.perf_counter() - start:.1f} s")
+
+for query in ("Rechnung", "Vertrag dringend", "Liefer", "Besprechung Montag wichtig"):
+    start = time.perf_counter()
+    results = store.search(query)
+    search_time = time.perf_counter() - start
+    start = time.perf_counter()
+    with open(log_path, "r", encoding="utf-8") as log:
+        scan_hits = [entry for entry in log.read().split("\n\n") if all(word in entry for word in query.split())]
+    scan_time = time.perf_counter() - start
+    print(f"{query!r:30s}: index {search_time * 1000:6.2f} ms ({len(results)} newest shown), "
+          f"log scan {scan_time * 1000:7.1f} ms ({len(scan_hits)} hits)")
+store.close()
@@ -0,0 +1,65 @@
+"""Release-to-response latency against a local mock server, with and without pre-warm. The mock delays
+every new connection to stand in for the DNS/TCP/TLS setup of the real API."""
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import numpy as np
+
+from src.config import SAMPLERATE
+from src.transcription_backends import OpenAIWhisperBackend
+
+CONNECT_DELAY_SECONDS = 0.15
+SPEAKING_SECONDS = 1.0
+REPEATS = 5
+
+
+class MockWhisperHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        time.sleep(CONNECT_DELAY_SECONDS)
+        super().setup()
+
+    def _respond(self, body):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self._respond("Hallo Welt".encode("utf-8"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+server = MockServer(("127.0.0.1", 0), MockWhisperHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+audio_data = (np.random.randn(5 * SAMPLERATE, 1) * 1000).astype(np.int16)
+
+for prewarm in (False, True):
+    timings = []
+    for _ in range(REPEATS):
+        # A fresh backend per run stands in for the first dictation after the connection went idle
+        backend = OpenAIWhisperBackend(api_key="test", base_url=base_url)
+        if prewarm:
+            backend.prewarm()
+        time.sleep(SPEAKING_SECONDS)
+        start = time.perf_counter()
+        backend.transcribe(audio_data)
+        timings.append(time.perf_counter() - start)
+    print(f"pre-warm {'on ' if prewarm else 'off'}: release-to-response median {np.median(timings) * 1000:7.1f} ms")
+server.shutdown()
@@ -0,0 +1,69 @@
+"""Time-to-first-audio against a local mock server that synthesizes at a fixed rate, comparing
+"download the whole chunk, then play" with playing the stream as it arrives."""
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import numpy as np
+import requests
+
+from src.config import SAMPLERATE
+from src.tts_stream import PCMStreamDecoder, StreamedChunk
+
+CHUNK_SECONDS = 20 # Audio length of one TTS chunk
+SYNTHESIS_SPEED = 4.0 # The mock produces audio this many times faster than real time
+PIECE_BYTES = 8192
+
+pcm = (np.random.randn(CHUNK_SECONDS * SAMPLERATE) * 1000).astype("<i2").tobytes()
+
+
+class MockTTSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/pcm")
+        self.send_header("Content-Length", str(len(pcm)))
+        self.end_headers()
+        delay = PIECE_BYTES / (2 * SAMPLERATE) / SYNTHESIS_SPEED
+        for offset in range(0, len(pcm), PIECE_BYTES):
+            time.sleep(delay)
+            self.wfile.write(pcm[offset:offset + PIECE_BYTES])
+            self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+server = MockServer(("127.0.0.1", 0), MockTTSHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+url = f"http://127.0.0.1:{server.server_address[1]}/v1/text-to-speech/voice/stream"
+
+start = time.perf_counter()
+response = requests.post(url, json={"text": "x"}, stream=True)
+audio_data = b"".join(response.iter_content(chunk_size=PIECE_BYTES))
+np.frombuffer(audio_data, dtype="<i2")
+print(f"full download : first audio after {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+start = time.perf_counter()
+chunk = StreamedChunk()
+decoder = PCMStreamDecoder()
+
+
+def download():
+    response = requests.post(url, json={"text": "x"}, stream=True)
+    for piece in response.iter_content(chunk_size=PIECE_BYTES):
+        chunk.append(decoder.decode(piece))
+    chunk.finish()
+
+threading.Thread(target=download, daemon=True).start()
+chunk.wait_for_data()
+print(f"streaming     : first audio after {(time.perf_counter() - start) * 1000:8.1f} ms")
+while not chunk.finished:
+    time.sleep(0.01)
+server.shutdown()
@@ -0,0 +1,38 @@
+"""Release-to-request-body-ready latency for the disk and the in-memory path."""
+import os
+import tempfile
+import time
+
+import numpy as np
+import scipy.io.wavfile as wavfile
+
+from src.config import SAMPLERATE, FILENAME
+from src.wav_io import encode_wav
+
+REPEATS = 5
+
+
+def disk_path(audio_data, path):
+    wavfile.write(path, SAMPLERATE, audio_data)
+    with open(path, "rb") as f:
+        body = f.read() # What the HTTP client does with the file before sending the request
+    os.remove(path)
+    return body
+
+
+def memory_path(audio_data):
+    return encode_wav(audio_data).getvalue()
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    path = os.path.join(tmp_dir, FILENAME)
+    for seconds in (10, 60, 600):
+        audio_data = (np.random.randn(seconds * SAMPLERATE, 1) * 1000).astype(np.int16)
+        results = {}
+        for name, run in (("disk", lambda: disk_path(audio_data, path)), ("in-memory", lambda: memory_path(audio_data))):
+            timings = []
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+            results[name] = min(timings) * 1000
+        print(f"{seconds:>4}s disk {results['disk']:8.2f} ms, in-memory {results['in-memory']:8.2f} ms")
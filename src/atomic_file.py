@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+
+def write_atomic(path, data, encoding="utf-8"):
+    """Writes data (bytes or str) to path so that readers see either the old or the complete new file.
+
+    The data goes to a temporary file in the same directory, is flushed to disk and then renamed over
+    path. On failure the temporary file is removed and the error is raised.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix="." + os.path.basename(path) + "-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data.encode(encoding) if isinstance(data, str) else data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
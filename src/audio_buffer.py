@@ -0,0 +1,144 @@
+import numpy as np
+
+from src.config import SAMPLERATE, CAPTURE_BUFFER_INITIAL_SECONDS
+
+
+def _read_segments(segments, segment_frames, channels, start, stop):
+    """Copies frames [start, stop) out of equally sized segments."""
+    first = start // segment_frames
+    last = (stop - 1) // segment_frames
+    parts = []
+    for index in range(first, last + 1):
+        offset = index * segment_frames
+        segment = segments[index]
+        parts.append(segment[max(start - offset, 0):min(stop - offset, segment.shape[0])])
+    if not parts:
+        return np.zeros((0, channels), dtype=np.int16)
+    if len(parts) == 1:
+        return parts[0].copy()
+    return np.concatenate(parts, axis=0)
+
+
+class AudioCaptureBuffer:
+    """Preallocated int16 capture buffer the audio callback writes into in place.
+
+    Recordings longer than the initial allocation spill into additional preallocated segments, so
+    the callback never copies already recorded audio. detach() hands the segments over as they are;
+    the consumer decides whether it needs them joined (see CapturedRecording).
+    """
+
+    def __init__(self, samplerate=SAMPLERATE, initial_seconds=CAPTURE_BUFFER_INITIAL_SECONDS, channels=1):
+        self.samplerate = samplerate
+        self.channels = channels
+        self._segment_frames = int(samplerate * initial_seconds)
+        self._segments = [self._allocate()]
+        self._current = self._segments[0] # Segment the callback writes into
+        self._fill = 0 # Frames written into the current segment
+        self._length = 0
+
+    def _allocate(self):
+        # np.zeros maps zeroed pages lazily, so unused capacity costs no physical memory
+        return np.zeros((self._segment_frames, self.channels), dtype=np.int16)
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def duration(self):
+        return self._length / self.samplerate
+
+    def reset(self):
+        # Keep the first allocation around so the next recording doesn't pay for it again
+        del self._segments[1:]
+        self._current = self._segments[0]
+        self._fill = 0
+        self._length = 0
+
+    def write(self, block):
+        frames = block.shape[0]
+        end = self._fill + frames
+        if end <= self._segment_frames:
+            # Fast path for the audio callback: the block fits into the current segment
+            self._current[self._fill:end] = block
+            self._fill = end
+            self._length += frames
+            return
+        written = 0
+        while written < frames:
+            if self._fill == self._segment_frames:
+                self._current = self._allocate()
+                self._segments.append(self._current)
+                self._fill = 0
+            count = min(frames - written, self._segment_frames - self._fill)
+            self._current[self._fill:self._fill + count] = block[written:written + count]
+            self._fill += count
+            written += count
+        self._length += frames
+
+    def read(self, start, stop):
+        # Copies frames [start, stop) while the recording is still running (i.e. before detach()).
+        # Safe to call from another thread as long as stop <= len(self): the length is only advanced
+        # after the samples have been written.
+        return _read_segments(self._segments, self._segment_frames, self.channels, start, stop)
+
+    def detach(self):
+        # Hand the recorded segments to another thread and start over with a fresh allocation,
+        # so the consumer can keep them while the next recording is captured. Nothing is copied.
+        recording = CapturedRecording(self._segments, self._segment_frames, self._length, self.samplerate, self.channels)
+        self._segments = [self._allocate()]
+        self._current = self._segments[0]
+        self._fill = 0
+        self._length = 0
+        return recording
+
+
+class CapturedRecording:
+    """A finished recording as the capture buffer's segments, handed to the processing thread as they are."""
+
+    def __init__(self, segments, segment_frames, length, samplerate=SAMPLERATE, channels=1):
+        self._segments = segments
+        self._segment_frames = segment_frames
+        self._length = length
+        self.samplerate = samplerate
+        self.channels = channels
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def duration(self):
+        return self._length / self.samplerate
+
+    def segments(self):
+        """Zero-copy views of the recorded samples, one per segment."""
+        views = []
+        for index, segment in enumerate(self._segments):
+            frames = min(self._segment_frames, self._length - index * self._segment_frames)
+            if frames > 0:
+                views.append(segment[:frames])
+        return views
+
+    def read(self, start, stop):
+        return _read_segments(self._segments, self._segment_frames, self.channels, start, min(stop, self._length))
+
+    def to_array(self):
+        """The recording as one array. Consumes the recording.
+
+        A single segment is returned as a view. Several segments are copied into one array, and each
+        segment is released as soon as it has been copied. The joined array is allocated but only
+        touched segment by segment, so resident memory peaks at the recording plus one segment
+        instead of twice the recording.
+        """
+        views = self.segments()
+        self._segments = []
+        self._length = 0
+        if len(views) == 1:
+            return views[0]
+        audio = np.empty((sum(len(view) for view in views), self.channels), dtype=np.int16)
+        offset = 0
+        while views:
+            view = views.pop(0)
+            audio[offset:offset + len(view)] = view
+            offset += len(view)
+            del view # Last reference; the segment's pages go back to the OS here
+        return audio
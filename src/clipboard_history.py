@@ -0,0 +1,88 @@
+import collections
+import json
+import threading
+import time
+
+from src.atomic_file import write_atomic
+from src.config import CLIPBOARD_HISTORY_FILE, CLIPBOARD_HISTORY_SIZE, CLIPBOARD_HISTORY_MAX_BYTES, CLIPBOARD_CYCLE_RESET_SECONDS
+
+
+class ClipboardHistory:
+    """The most recent transcriptions, bounded by entry count and by total UTF-8 size.
+
+    Entries live in a deque, so adding one and evicting the oldest are O(1). A text identical to the
+    newest entry is not added again. previous() walks backwards from the newest entry, one step per
+    call, and wraps around after the oldest; after a pause of CLIPBOARD_CYCLE_RESET_SECONDS it starts
+    over. With a path, the history is saved after every change and restored on startup.
+    """
+
+    def __init__(self, capacity=CLIPBOARD_HISTORY_SIZE, max_bytes=CLIPBOARD_HISTORY_MAX_BYTES, path=CLIPBOARD_HISTORY_FILE,
+                 cycle_reset=CLIPBOARD_CYCLE_RESET_SECONDS):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.path = path
+        self.cycle_reset = cycle_reset
+        self._lock = threading.Lock()
+        self._entries = collections.deque() # (text, size in bytes), oldest first
+        self._bytes = 0
+        self._cursor = 0 # Steps back from the newest entry during a cycle
+        self._last_cycle = 0.0
+        if path:
+            self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def add(self, text):
+        if not text:
+            return
+        with self._lock:
+            self._cursor = 0 # A new transcription starts the next cycle from the top
+            if self._entries and self._entries[-1][0] == text:
+                return
+            self._append(text)
+            if self.path:
+                self._save()
+
+    def _append(self, text):
+        size = len(text.encode("utf-8"))
+        self._entries.append((text, size))
+        self._bytes += size
+        # The newest entry is always kept, even if it alone exceeds the byte cap
+        while len(self._entries) > 1 and (len(self._entries) > self.capacity or self._bytes > self.max_bytes):
+            self._bytes -= self._entries.popleft()[1]
+
+    def previous(self):
+        """The next older entry as (text, position), position 1 being the newest; None if there is none."""
+        with self._lock:
+            if len(self._entries) < 2:
+                return None
+            now = time.monotonic()
+            if now - self._last_cycle > self.cycle_reset:
+                self._cursor = 0
+            self._last_cycle = now
+            # The newest entry is what the clipboard already holds, so the first step goes one further back;
+            # after the oldest the cycle wraps around to the newest
+            self._cursor = (self._cursor + 1) % len(self._entries)
+            return self._entries[-1 - self._cursor][0], self._cursor + 1
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                texts = json.load(f)
+        except (OSError, ValueError):
+            return # Missing or corrupt; rewritten with the next entry
+        for text in texts:
+            if isinstance(text, str) and text:
+                self._append(text) # Also applies caps that were lowered since the last run
+
+    def _save(self):
+        try:
+            # Never leave a half-written history behind
+            write_atomic(self.path, json.dumps([text for text, _ in self._entries], ensure_ascii=False))
+        except OSError:
+            pass # The in-memory history keeps working without persistence
@@ -1,19 +1,104 @@
 import os
 import sys
-import pythoncom
-from win32com.client import Dispatch
 
 # Global Constants
 SAMPLERATE = 16000
-FILENAME = "aufnahme.wav"
+FILENAME = "aufnahme.wav" # Upload file name; recordings are only written to disk when DEBUG_SAVE_RECORDINGS is set
 AUDIO_OUTPUT_FILENAME = "elevenlabs_output.mp3" # For Eleven Labs audio output
+TTS_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "tts_cache") # Synthesized chunks, reused for repeated texts
+TTS_CACHE_MAX_BYTES = 200 * 1024 * 1024 # Least recently used chunks are evicted above this size
+TTS_PREFETCH_DEPTH = 2 # Chunks fetched and decoded ahead while the current one plays
+TTS_STREAMING = True # Use the streaming endpoint, so audio starts arriving before the whole chunk is synthesized
+TTS_OUTPUT_FORMAT = f"pcm_{SAMPLERATE}" # Raw 16-bit PCM at the playback rate; played without any decoding or resampling
+TTS_PLAYBACK_BLOCK_FRAMES = 1024 # Samples per block handed to the playback queue
+TTS_PLAYBACK_QUEUE_BLOCKS = 8 # Blocks buffered ahead of the output device (about half a second)
+TTS_FIRST_CHUNK_CHARS = 100 # Small first chunk, so the first audio arrives quickly
+TTS_MAX_CHUNK_CHARS = 500 # Hard upper limit for any chunk
+TTS_CHUNK_GROWTH = 2.0 # Each following chunk may be this much larger than the one before, up to the limit
+VOICE_CACHE_FILE = os.path.join(os.path.dirname(__file__), "voices_cache.json") # ElevenLabs voice list, shown without waiting for the API
+VOICE_CACHE_TTL_SECONDS = 24 * 60 * 60 # Older lists are revalidated in the background when the TTS window opens
 MIN_RECORDING_DURATION_SECONDS = 1 # Minimum duration for a recording to be processed by Whisper
-SILENCE_THRESHOLD = 200 # Maximum absolute amplitude for audio to be considered silent
+DEBUG_SAVE_RECORDINGS = False # Keep a WAV copy of every recording on disk for debugging
+CAPTURE_BUFFER_INITIAL_SECONDS = 60 # Preallocated capture buffer size; longer recordings spill into further segments of this size
+
+# Voice activity detection: trims silence before upload and gates recordings without speech
+VAD_FRAME_SECONDS = 0.02
+VAD_ENERGY_THRESHOLD = 200 # Minimum frame RMS (int16) to count as speech
+VAD_NOISE_FACTOR = 3.0 # Frames must also be this much louder than the recording's noise floor
+VAD_NOISE_CEILING = 0.5 # ...but the noise-based threshold never exceeds this fraction of the loud (90th percentile) frames
+VAD_LOUD_FACTOR = 4.0 # Recordings whose loud frames exceed this multiple of VAD_ENERGY_THRESHOLD are never trimmed to nothing
+VAD_SPECTRAL = False # Additionally require most of a frame's energy to be inside the voice band
+VAD_SPEECH_BAND_HZ = (300, 3400)
+VAD_SPEECH_BAND_RATIO = 0.5
+VAD_MIN_SPEECH_SECONDS = 0.1 # Shorter bursts (clicks, knocks) are not speech, however loud
+VAD_PADDING_SECONDS = 0.2 # Context kept before and after speech
+VAD_MAX_PAUSE_SECONDS = 1.0 # Internal pauses longer than this are shortened to this length
+
+# Transcription backends: "openai", "local" (faster-whisper, optional dependency), "stub" (offline testing)
+# or "auto", which sends short utterances to the warm local model and falls back to the other engine on failure
+TRANSCRIPTION_BACKEND = "auto"
+TRANSCRIPTION_LANGUAGE = "de"
+WHISPER_API_MODEL = "whisper-1"
+WHISPER_CONNECT_TIMEOUT_SECONDS = 5
+WHISPER_READ_TIMEOUT_SECONDS = 60
+WHISPER_KEEPALIVE_SECONDS = 120 # How long the pre-warmed connection is kept open between dictations
+LOCAL_WHISPER_MODEL = "small"
+LOCAL_WHISPER_DEVICE = "auto"
+LOCAL_WHISPER_COMPUTE_TYPE = "int8"
+LOCAL_MAX_DURATION_SECONDS = 15 # In "auto" mode, recordings up to this length go to the local model first
+
+# Transcription queue: recordings are transcribed on a bounded pool and delivered in recording order
+TRANSCRIPTION_MAX_WORKERS = 2
+TRANSCRIPTION_MAX_PENDING = 4 # New recordings are refused while this many are waiting or in flight
+
+# Streaming transcription: upload segments at speech pauses while F3 is still held
+STREAMING_TRANSCRIPTION = True
+STREAMING_MIN_SEGMENT_SECONDS = 8 # Don't cut segments shorter than this; very short segments transcribe poorly
+STREAMING_MAX_SEGMENT_SECONDS = 30 # Cut at the quietest point if no pause was found by then
+STREAMING_PAUSE_SECONDS = 0.5 # Minimum silence that counts as a pause
+STREAMING_POLL_INTERVAL_SECONDS = 0.25 # How often the running recording is checked for pauses
+STREAMING_MAX_PARALLEL_UPLOADS = 2
+
+# Transcript history: searchable SQLite store that replaces transkript_log.txt
+TRANSCRIPT_DB_FILE = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "transcripts.db"))
+TRANSCRIPT_LEGACY_LOG = "transkript_log.txt" # Imported once when the database is created
+TRANSCRIPT_RETENTION_DAYS = 5 * 365 # Older transcripts are deleted; 0 keeps everything
+TRANSCRIPT_FLUSH_SECONDS = 2.0 # New transcripts are written in batches at this interval
+TRANSCRIPT_BATCH_SIZE = 50 # ...or as soon as this many are waiting
+
+# Clipboard history, cycled backwards with Ctrl+Shift+V
+CLIPBOARD_HISTORY_SIZE = 50 # Most recent transcriptions kept
+CLIPBOARD_HISTORY_MAX_BYTES = 256 * 1024 # Older entries are dropped once the texts exceed this (UTF-8)
+CLIPBOARD_HISTORY_FILE = os.path.join(os.path.dirname(__file__), "clipboard_history.json") # None keeps the history in memory only
+CLIPBOARD_CYCLE_RESET_SECONDS = 3.0 # After this long without Ctrl+Shift+V, cycling starts again at the newest entry
+
+# Status window animation
+FIREFLY_COUNT = 50 # Number of fireflies in the status window background
+FIREFLY_SHADES = 16 # Colour variations pre-rendered per firefly colour
+ANIMATION_ACTIVE_INTERVAL_MS = 20 # Frame interval while recording, processing or changing colour
+ANIMATION_IDLE_INTERVAL_MS = 100 # Frame interval otherwise; the animation stops entirely while the window is hidden
+
+# Spectral analyzer
+SPECTRUM_MIN_FREQUENCY = 80 # Hz; lower bins are not displayed. Common voice fundamental is above this.
+SPECTRUM_START_WEIGHT = 0.001 # Weighting at 0 Hz: very low sensitivity at low frequencies
+SPECTRUM_END_WEIGHT = 100.0 # Weighting at Nyquist: very high sensitivity at high frequencies
+SPECTRUM_OVERLAP = 0.5 # Overlap of consecutive frames when several are averaged (Welch)
+SPECTRUM_CHUNK_SIZE = 1024 # FFT frame size of the live spectrum
+SPECTRUM_AVERAGED_FRAMES = 3 # Overlapping frames averaged per displayed spectrum
+SPECTRUM_REFRESH_MS = 50 # Display rate of the live spectrum, independent of the audio block size
+SPECTRUM_FEED_SECONDS = 1.0 # Ring buffer between the audio callback and the display
+SPECTROGRAM_HISTORY_SECONDS = 60 # Time span of the waterfall view; bounds its memory
+SPECTROGRAM_FLOOR_DB = 0.0 # Colour range of the waterfall (weighted dB); history starts at the floor
+SPECTROGRAM_CEILING_DB = 140.0
+SPECTRUM_BANDS = 48 # Bands of the band display; bins are folded into these
+SPECTRUM_BAND_SCALE = "mel" # "mel" or "log" spacing of the bands
+SPECTRUM_PEAK_DECAY_DB_PER_SECOND = 20.0 # How fast the peak-hold line falls back
 
 ICON_PATH = os.path.join(os.path.dirname(__file__), "..", "mic_icon.png") # Adjusted path
 
 # Autostart-Link (Windows)
 def setup_autostart():
+    from win32com.client import Dispatch # Only needed here; keeps pywin32 out of the startup path
     autostart_dir = os.path.join(os.getenv("APPDATA"), "Microsoft\\Windows\\Start Menu\\Programs\\Startup")
     shortcut_path = os.path.join(autostart_dir, "SprachTray.lnk")
     if not os.path.exists(shortcut_path):
@@ -1,18 +1,28 @@
 import os
 import numpy as np
-import sounddevice as sd
 import requests
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5 import QtWidgets, QtGui, QtCore
 import dotenv
 from . import settings # Import the new settings module using relative import
+from .config import TTS_PREFETCH_DEPTH, TTS_STREAMING, TTS_OUTPUT_FORMAT, TTS_PLAYBACK_BLOCK_FRAMES
+from .playback_engine import PlaybackEngine
+from .text_chunker import split_text_into_chunks
+from .voice_catalog import VoiceCatalog
+from .tts_cache import TTSCache
+from .tts_stream import PCMStreamDecoder, StreamedChunk
 
 dotenv.load_dotenv()
 
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 # Load voice ID from settings, then .env, then default
 ELEVENLABS_VOICE_ID = settings.get_setting("elevenlabs_voice_id", os.getenv("ELEVENLABS_VOICE_ID", "ZthjuvLPty3kTMaNKVKb"))
-SAMPLERATE = 16000
+ELEVENLABS_MODEL_ID = "eleven_multilingual_v2"
+ELEVENLABS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.75
+}
 
 class ElevenLabsInputWindow(QtWidgets.QWidget):
     def __init__(self, parent=None):
@@ -161,7 +171,15 @@ class ElevenLabsInputWindow(QtWidgets.QWidget):
         self.resume_button.clicked.connect(self.resume_playback)
         self.voice_dropdown.currentIndexChanged.connect(self.on_voice_selected)
 
-        self.load_voices() # Load voices when the window initializes
+        self.tts_cache = TTSCache() # Repeated texts are played from disk without an API request
+
+        # One output stream for all texts; stop/resume only pause it
+        self.playback_engine = PlaybackEngine()
+        self._playback_cancelled = None
+        self._playback_lock = threading.Lock()
+
+        self.voice_catalog = VoiceCatalog()
+        self._voices_loaded = False # Voices are loaded when the window is first shown
 
     def keyPressEvent(self, event):
         if event.key() == QtCore.Qt.Key_Escape:
@@ -174,24 +192,48 @@ class ElevenLabsInputWindow(QtWidgets.QWidget):
         self.status_label.setText(text)
         self.status_label.verticalScrollBar().setValue(self.status_label.verticalScrollBar().minimum()) # Scroll to top
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._voices_loaded:
+            # Deferred to the first show, so starting the app needs no network
+            self._voices_loaded = True
+            self.load_voices()
+
+    def closeEvent(self, event):
+        self.shutdown_playback()
+        super().closeEvent(event)
+
+    def shutdown_playback(self):
+        """Cancels the current text, even a paused one, and releases the output device.
+
+        Called when the window is closed and when the app quits; a paused run would otherwise wait
+        for the stream forever. The next text reopens the device.
+        """
+        with self._playback_lock:
+            if self._playback_cancelled:
+                self._playback_cancelled.set()
+            self.playback_engine.clear() # Releases a feeder blocked on the full queue or on the end marker
+            self.playback_engine.close()
+
     def load_voices(self):
         if not ELEVENLABS_API_KEY:
             self.set_status("Eleven Labs API Key nicht gefunden. Stimmen können nicht geladen werden.")
             return
 
-        self.set_status("Lade Eleven Labs Stimmen...")
-        threading.Thread(target=self._fetch_voices).start()
+        cached_voices = self.voice_catalog.cached()
+        if cached_voices is not None:
+            self.update_voice_dropdown(cached_voices) # Rendered instantly; a refresh may follow
+            if not self.voice_catalog.is_stale():
+                return
+        else:
+            self.set_status("Lade Eleven Labs Stimmen...")
+        threading.Thread(target=self._fetch_voices, daemon=True).start()
 
     def _fetch_voices(self):
-        url = "https://api.elevenlabs.io/v1/voices"
-        headers = {
-            "Accept": "application/json",
-            "xi-api-key": ELEVENLABS_API_KEY
-        }
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            voices_data = response.json()
+            voices_data = self.voice_catalog.refresh(ELEVENLABS_API_KEY)
+            if voices_data is None:
+                return # The cached list shown already is current
             
             # Use QMetaObject.invokeMethod to update UI from the worker thread
             QtCore.QMetaObject.invokeMethod(self, "update_voice_dropdown",
@@ -261,145 +303,170 @@ class ElevenLabsInputWindow(QtWidgets.QWidget):
 
         self.set_status("Sende Text an Eleven Labs...")
         QtCore.QMetaObject.invokeMethod(self.speak_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
+        QtCore.QMetaObject.invokeMethod(self.resume_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
 
         # Run API calls and playback in a separate thread to keep UI responsive
-        threading.Thread(target=self._process_and_play_chunks, args=(text,)).start()
-
-    def _split_text_into_chunks(self, text, max_chars=500):
-        """Splits text into chunks, trying to respect sentence boundaries."""
-        import re
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        chunks = []
-        current_chunk = ""
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) + 1 <= max_chars:
-                current_chunk += (sentence + " ").strip()
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                current_chunk = (sentence + " ").strip()
-        if current_chunk:
-            chunks.append(current_chunk)
-        return chunks
+        # Daemon, so a run that is blocked on a paused stream can never keep the process alive
+        threading.Thread(target=self._process_and_play_chunks, args=(text,), daemon=True).start()
+
+    def _tts_request(self, chunk_text):
+        voice_id = ELEVENLABS_VOICE_ID
+        url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+        if TTS_STREAMING:
+            # The streaming endpoint starts sending audio before the whole chunk is synthesized
+            url += "/stream"
+        headers = {
+            "Accept": "*/*",
+            "Content-Type": "application/json",
+            "xi-api-key": ELEVENLABS_API_KEY
+        }
+        data = {
+            "text": chunk_text,
+            "model_id": ELEVENLABS_MODEL_ID,
+            "voice_settings": ELEVENLABS_VOICE_SETTINGS
+        }
+        # Raw PCM at the playback rate needs no decoder, no ffmpeg and no resampling
+        params = {"output_format": TTS_OUTPUT_FORMAT}
+
+        response = requests.post(url, headers=headers, json=data, params=params, stream=True)
+        response.raise_for_status()
+        return response
+
+    def _download_chunk(self, chunk_text, streamed, cancelled):
+        """Runs on a prefetch worker: fills `streamed` from the TTS cache or the API.
+
+        The PCM response is decoded and handed to playback piece by piece as it arrives.
+        """
+        cache_key = TTSCache.make_key(ELEVENLABS_VOICE_ID, ELEVENLABS_MODEL_ID, ELEVENLABS_VOICE_SETTINGS, chunk_text, TTS_OUTPUT_FORMAT)
+        error = None
+        try:
+            if cancelled.is_set():
+                return
+            audio_data = self.tts_cache.get(cache_key)
+            if audio_data is not None:
+                streamed.append(np.frombuffer(audio_data, dtype="<i2"))
+                return
+            response = self._tts_request(chunk_text)
+            decoder = PCMStreamDecoder()
+            for piece in response.iter_content(chunk_size=4096):
+                if cancelled.is_set():
+                    response.close()
+                    return
+                streamed.append(decoder.decode(piece))
+            self.tts_cache.put(cache_key, streamed.samples().astype("<i2").tobytes())
+        except Exception as e:
+            error = e
+        finally:
+            streamed.finish(error)
 
     def _process_and_play_chunks(self, full_text):
-        chunks = self._split_text_into_chunks(full_text)
+        self._play_chunks(split_text_into_chunks(full_text))
+
+    def _play_chunks(self, chunks):
+        """Feeds the chunks into the playback engine while the next TTS_PREFETCH_DEPTH chunks are downloaded.
+
+        A chunk starts playing as soon as its first samples have arrived, and chunks follow each other
+        without a gap because they all go through the same output stream.
+        """
         total_chunks = len(chunks)
+        # A fresh event per run, so a replaced run's workers can't be revived by a later one
+        cancelled = threading.Event()
+        with self._playback_lock:
+            if self._playback_cancelled:
+                self._playback_cancelled.set() # A new text replaces one that is still playing or paused
+            self._playback_cancelled = cancelled
+            self.playback_engine.clear()
+            self.playback_engine.resume()
+            self.playback_engine.start()
+        executor = ThreadPoolExecutor(max_workers=TTS_PREFETCH_DEPTH)
+        streamed_chunks = {}
+
+        def schedule(index):
+            if index < total_chunks and index not in streamed_chunks:
+                streamed_chunks[index] = StreamedChunk()
+                executor.submit(self._download_chunk, chunks[index], streamed_chunks[index], cancelled)
 
         try:
-            for i, chunk_text in enumerate(chunks):
+            for i in range(1 + TTS_PREFETCH_DEPTH):
+                schedule(i)
+
+            for i in range(total_chunks):
                 QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"Verarbeite Chunk {i+1}/{total_chunks}..."))
-                
-                url = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}"
-                headers = {
-                    "Accept": "audio/mpeg",
-                    "Content-Type": "application/json",
-                    "xi-api-key": ELEVENLABS_API_KEY
-                }
-                data = {
-                    "text": chunk_text,
-                    "model_id": "eleven_multilingual_v2",
-                    "voice_settings": {
-                        "stability": 0.5,
-                        "similarity_boost": 0.75
-                    }
-                }
-
-                response = requests.post(url, headers=headers, json=data, stream=True)
-                response.raise_for_status()
-
-                audio_data = b""
-                for chunk in response.iter_content(chunk_size=1024):
-                    audio_data += chunk
-
-                # Save the audio to a temporary file for pydub to load
-                temp_audio_file = "temp_elevenlabs_chunk.mp3"
-                with open(temp_audio_file, "wb") as f:
-                    f.write(audio_data)
+                streamed = streamed_chunks.pop(i)
+                streamed.wait_for_data()
+                if cancelled.is_set():
+                    return
+                if streamed.error:
+                    raise streamed.error
+                schedule(i + 1 + TTS_PREFETCH_DEPTH) # Keep the lookahead full
 
                 QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"Spiele Chunk {i+1}/{total_chunks} ab..."))
-                self._play_audio_file_chunk(temp_audio_file) # Play this chunk
-                os.remove(temp_audio_file) # Clean up temp file
-
-            QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "Wiedergabe abgeschlossen."))
+                QtCore.QMetaObject.invokeMethod(self.stop_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, True))
+                if not self._feed_chunk(streamed, cancelled):
+                    return
+                if streamed.error:
+                    raise streamed.error # The download broke off in the middle of the chunk
+
+            # Signalled by the callback once the last block has been handed to the device; a paused stream simply keeps us waiting
+            marker = self.playback_engine.enqueue_marker(cancelled)
+            if marker is None:
+                return
+            while not marker.wait(0.1):
+                if cancelled.is_set():
+                    return # Closed or replaced while paused
+            if cancelled.is_set():
+                return
+            cache_stats = self.tts_cache.stats()
+            QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"Wiedergabe abgeschlossen. (Cache: {cache_stats['hits']} Treffer, {cache_stats['misses']} neu geladen)"))
 
         except requests.exceptions.RequestException as e:
             QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"Fehler bei Eleven Labs API: {e}"))
         except Exception as e:
             QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"Ein unerwarteter Fehler ist aufgetreten: {e}"))
         finally:
-            QtCore.QMetaObject.invokeMethod(self.speak_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, True))
-            QtCore.QMetaObject.invokeMethod(self.stop_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
-            QtCore.QMetaObject.invokeMethod(self.resume_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
-            # No need to remove AUDIO_OUTPUT_FILENAME as we use temp_audio_file
-
-    def _play_audio_file_chunk(self, file_path):
-        try:
-            import shutil
-            from pydub import AudioSegment
-
-            if not shutil.which("ffmpeg") and not shutil.which("ffprobe"):
-                error_msg = "Fehler: FFmpeg/FFprobe nicht im PATH gefunden. Bitte installieren Sie FFmpeg und fügen Sie es Ihrem System-PATH hinzu."
-                QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, error_msg))
-                return
+            # Drop prefetches that haven't started; running downloads see the cancel flag and stop
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            with self._playback_lock:
+                if self._playback_cancelled is cancelled:
+                    # Still the current run: let the device drain and go idle until the next text
+                    self.playback_engine.stop()
+                    QtCore.QMetaObject.invokeMethod(self.speak_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, True))
+                    QtCore.QMetaObject.invokeMethod(self.stop_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
+                    QtCore.QMetaObject.invokeMethod(self.resume_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
+
+    def _feed_chunk(self, streamed, cancelled):
+        """Queues a chunk block by block as it downloads. Returns False if the run was cancelled."""
+        position = 0
+        while not cancelled.is_set():
+            block = streamed.read_next(position, TTS_PLAYBACK_BLOCK_FRAMES, timeout=0.1)
+            if len(block) == 0:
+                if streamed.finished and position >= len(streamed):
+                    return True
+                continue # Timed out waiting for the download; check the cancel flag again
+            if not self.playback_engine.enqueue(block, cancelled):
+                return False
+            position += len(block)
+        return False
 
-            audio = AudioSegment.from_file(file_path)
-            self.audio_data_to_play = np.array(audio.set_frame_rate(SAMPLERATE).set_channels(1).set_sample_width(2).get_array_of_samples())
-            self.playback_position = 0
-
-            self.playback_stream = sd.OutputStream(samplerate=SAMPLERATE, channels=1, dtype='int16', callback=self._playback_callback)
-            self.playback_stream.start()
+    def stop_playback(self):
+        # Pauses the output stream; the queued audio and the running downloads are kept
+        self.playback_engine.pause()
+        QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "Wiedergabe pausiert."))
+        QtCore.QMetaObject.invokeMethod(self.stop_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
+        QtCore.QMetaObject.invokeMethod(self.resume_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, True))
+        # A new text may replace the paused one
+        QtCore.QMetaObject.invokeMethod(self.speak_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, True))
 
+    def resume_playback(self):
+        # Continues exactly where the callback was gated, without reopening the device
+        if self._playback_cancelled and not self._playback_cancelled.is_set():
+            self.playback_engine.resume()
+            QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "Wiedergabe fortgesetzt..."))
+            QtCore.QMetaObject.invokeMethod(self.speak_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
             QtCore.QMetaObject.invokeMethod(self.stop_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, True))
             QtCore.QMetaObject.invokeMethod(self.resume_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
-            # Wait for this chunk to finish playing before returning
-            while self.playback_stream.is_active:
-                sd.sleep(100) # Sleep briefly to avoid busy-waiting
-
-        except ImportError:
-            error_msg = "Fehler: pydub nicht installiert. Bitte 'pip install pydub' ausführen."
-            QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, error_msg))
-        except Exception as e:
-            error_msg = f"Fehler beim Abspielen der Audiodatei: {e}"
-            QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, error_msg))
-            QtCore.QMetaObject.invokeMethod(self.stop_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
-            QtCore.QMetaObject.invokeMethod(self.resume_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
-
-    def _playback_callback(self, outdata, frames, time, status):
-        if status:
-            pass # Removed print(status)
-        chunk_size = frames
-        remaining_data = len(self.audio_data_to_play) - self.playback_position
-        if remaining_data >= chunk_size:
-            outdata[:] = self.audio_data_to_play[self.playback_position:self.playback_position + chunk_size].reshape(-1, 1)
-            self.playback_position += chunk_size
         else:
-            outdata[:remaining_data] = self.audio_data_to_play[self.playback_position:].reshape(-1, 1)
-            outdata[remaining_data:] = 0 # Fill remaining with zeros
-            self.playback_position += remaining_data
-            # Playback finished for this chunk
-            # The main loop in _process_and_play_chunks will handle overall status
-            if self.playback_stream:
-                self.playback_stream.stop()
-                self.playback_stream.close()
-                self.playback_stream = None
-
-    def stop_playback(self):
-        if self.playback_stream and self.playback_stream.is_active:
-            self.playback_stream.stop()
-            QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "Wiedergabe gestoppt."))
+            QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "Keine weiteren Daten zum Abspielen."))
             QtCore.QMetaObject.invokeMethod(self.stop_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
-            QtCore.QMetaObject.invokeMethod(self.resume_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, True))
-
-    def resume_playback(self):
-        if self.playback_stream and not self.playback_stream.is_active:
-            if self.playback_position < len(self.audio_data_to_play):
-                self.playback_stream = sd.OutputStream(samplerate=SAMPLERATE, channels=1, dtype='int16', callback=self._playback_callback)
-                self.playback_stream.start()
-                QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "Wiedergabe fortgesetzt..."))
-                QtCore.QMetaObject.invokeMethod(self.stop_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, True))
-                QtCore.QMetaObject.invokeMethod(self.resume_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
-            else:
-                QtCore.QMetaObject.invokeMethod(self, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "Keine weiteren Daten zum Abspielen."))
-                QtCore.QMetaObject.invokeMethod(self.stop_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
-                QtCore.QMetaObject.invokeMethod(self.resume_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
+            QtCore.QMetaObject.invokeMethod(self.resume_button, "setEnabled", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
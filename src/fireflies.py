@@ -0,0 +1,44 @@
+import numpy as np
+
+from src.config import FIREFLY_COUNT
+
+
+class FireflySwarm:
+    """Firefly state as contiguous arrays (struct of arrays), updated with a few vectorized operations per frame."""
+
+    MIN_SIZE = 2
+    MAX_SIZE = 8
+
+    def __init__(self, count=FIREFLY_COUNT, width=320, height=90, rng=None):
+        rng = rng or np.random.default_rng()
+        self.count = count
+        self.x = rng.uniform(0, width, count)
+        self.y = rng.uniform(0, height, count)
+        self.size = rng.uniform(self.MIN_SIZE, self.MAX_SIZE, count)
+        self.color_offset = rng.uniform(0, 1, count)
+        self.phase_offset = rng.uniform(0, 2 * np.pi, count)
+        self.speed = rng.uniform(0.5, 1.5, count)
+
+    def step(self, phase, width, height, frames=1.0):
+        # `frames` is the elapsed time in nominal frames, so a lower frame rate takes bigger steps
+        self.x += np.sin(phase * self.speed * 0.1) * 0.1 * frames # Further reduced movement per frame
+        self.y += np.cos(phase * self.speed * 0.125) * 0.125 * frames
+        # Fireflies leaving one edge come back in at the opposite one
+        self.x = np.where(self.x < -self.size, width + self.size, self.x)
+        self.x = np.where(self.x > width + self.size, -self.size, self.x)
+        self.y = np.where(self.y < -self.size, height + self.size, self.y)
+        self.y = np.where(self.y > height + self.size, -self.size, self.y)
+
+    def shades(self, levels):
+        """The colour offsets quantized to `levels` steps, i.e. each firefly's row in a sprite atlas."""
+        return np.rint(self.color_offset * (levels - 1)).astype(int)
+
+    def sprites(self, phase):
+        """Per-firefly drawing parameters for the current phase.
+
+        Returns the centre (x, y), the integer diameter and the opacity (0.3 to 1.0) as arrays.
+        """
+        pulse = (np.sin(phase * self.speed + self.phase_offset) + 1) / 2.0
+        diameter = np.clip((self.size * (0.5 + pulse * 0.5)).astype(int), 1, self.MAX_SIZE)
+        opacity = 0.3 + pulse * 0.7
+        return self.x, self.y, diameter, opacity
@@ -0,0 +1,129 @@
+import queue
+import threading
+
+import numpy as np
+import sounddevice as sd
+
+from src.config import SAMPLERATE, TTS_PLAYBACK_QUEUE_BLOCKS
+
+
+class PlaybackEngine:
+    """Gapless playback through one long-lived OutputStream.
+
+    Producers enqueue int16 blocks; the audio callback plays them back to back. Pausing only gates
+    the callback (it outputs silence and leaves the queue alone), so the stream is never torn down.
+    A marker event can be queued behind the audio; the callback sets it once everything before it
+    has been handed to the device.
+
+    Every queued item carries the generation it was enqueued in, and clear() starts a new one. A
+    producer of the previous text that was blocked in put() while clear() ran may still get its
+    block into the queue, but the callback drops it instead of playing it before the new text.
+    """
+
+    def __init__(self, samplerate=SAMPLERATE, max_blocks=TTS_PLAYBACK_QUEUE_BLOCKS):
+        self.samplerate = samplerate
+        # Bounded, so a producer blocks (and stops together with a paused stream) instead of running ahead
+        self._queue = queue.Queue(maxsize=max_blocks)
+        self._current = None
+        self._offset = 0
+        self._paused = False
+        self._clear_requested = False
+        self._generation = 0
+        self._stream = None
+        self._lock = threading.Lock()
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def start(self):
+        with self._lock:
+            if self._stream is None:
+                self._stream = sd.OutputStream(samplerate=self.samplerate, channels=1, dtype='int16', callback=self._callback)
+            if not self._stream.active:
+                self._stream.start()
+
+    def stop(self):
+        # Stops the device between texts; the stream object is kept and restarted by start()
+        with self._lock:
+            if self._stream is not None and self._stream.active:
+                self._stream.stop()
+
+    def close(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+    def enqueue(self, samples, cancelled=None):
+        """Queues samples for playback; blocks while the queue is full. Returns False if cancelled."""
+        if len(samples) == 0:
+            return True
+        return self._put(np.ascontiguousarray(samples, dtype=np.int16).reshape(-1), cancelled)
+
+    def enqueue_marker(self, cancelled=None):
+        """Queues an end marker and returns its event, or None if cancelled."""
+        marker = threading.Event()
+        return marker if self._put(marker, cancelled) else None
+
+    def _put(self, item, cancelled):
+        # The generation is read before the cancel check: a text is cancelled before clear() starts
+        # the next generation, so an item either sees the cancellation or is tagged as stale
+        generation = self._generation
+        while True:
+            if cancelled is not None and cancelled.is_set():
+                return False
+            try:
+                self._queue.put((generation, item), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+
+    def pause(self):
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+
+    def clear(self):
+        """Drops everything queued, e.g. when a new text replaces the current one."""
+        self._generation += 1 # Anything still on its way into the queue is dropped by the callback
+        try:
+            while True:
+                _, item = self._queue.get_nowait()
+                if isinstance(item, threading.Event):
+                    item.set() # Nobody must wait for audio that will never play
+        except queue.Empty:
+            pass
+        # The callback owns the block it is playing; let it drop that one itself
+        self._clear_requested = True
+
+    def _callback(self, outdata, frames, time, status):
+        if status:
+            pass # Underflows are expected while the network falls behind
+        if self._clear_requested:
+            self._current = None
+            self._clear_requested = False
+        if self._paused:
+            outdata.fill(0)
+            return
+        written = 0
+        while written < frames:
+            if self._current is None or self._offset >= len(self._current):
+                try:
+                    generation, item = self._queue.get_nowait()
+                except queue.Empty:
+                    self._current = None
+                    break
+                if isinstance(item, threading.Event):
+                    item.set()
+                    continue
+                if generation != self._generation:
+                    continue # Left over from a text that was replaced
+                self._current = item
+                self._offset = 0
+            count = min(frames - written, len(self._current) - self._offset)
+            outdata[written:written + count, 0] = self._current[self._offset:self._offset + count]
+            self._offset += count
+            written += count
+        outdata[written:] = 0
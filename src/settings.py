@@ -1,23 +1,212 @@
+import atexit
 import json
 import os
+import threading
+import time
+
+from src.atomic_file import write_atomic
 
 SETTINGS_FILE = os.path.join(os.path.dirname(__file__), 'settings.json')
+SAVE_DELAY_SECONDS = 0.5 # Changes within this window are written together
+WATCH_INTERVAL_SECONDS = 2.0 # How often the file is checked for edits made outside the app
+
+
+class SettingsStore:
+    """Process-wide settings, read from disk once and kept in memory.
+
+    set() updates memory immediately, notifies listeners and schedules a debounced write-behind;
+    the file is replaced atomically, so a crash or a concurrent reader never sees half a file.
+    A file that can't be parsed at startup is moved aside to settings.json.bak before anything
+    is written. While the app runs, start_watching() picks up edits made to the file by hand.
+    """
+
+    def __init__(self, path=SETTINGS_FILE, save_delay=SAVE_DELAY_SECONDS, watch_interval=WATCH_INTERVAL_SECONDS):
+        self.path = path
+        self.save_delay = save_delay
+        self.watch_interval = watch_interval
+        self._lock = threading.RLock()
+        self._save_condition = threading.Condition(self._lock)
+        self._data = None
+        self._listeners = {} # key (None for every key) -> callbacks(key, value)
+        self._save_due = None
+        self._writer = None
+        self._dirty = False
+        self._mtime = None
+        self._writable = True # False while an unreadable file could not be moved aside
+        self._watcher = None
+        self._stop_watching = threading.Event()
+
+    def _read_file(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f), os.path.getmtime(self.path)
+        except FileNotFoundError:
+            return {}, None
+        except (OSError, ValueError):
+            return None, None # Unreadable, e.g. mid-edit in an editor; keep what we have
+
+    def _ensure_loaded(self):
+        if self._data is None:
+            data, self._mtime = self._read_file()
+            if data is None:
+                self._set_aside_unreadable()
+            self._data = data or {}
+
+    def _set_aside_unreadable(self):
+        # Starting with defaults must not overwrite the user's file; keep it for inspection instead
+        try:
+            os.replace(self.path, self.path + '.bak')
+        except OSError:
+            self._writable = False # Not written until the file can be read again (see reload)
+
+    def get(self, key, default=None):
+        with self._lock:
+            self._ensure_loaded()
+            return self._data.get(key, default)
+
+    def get_str(self, key, default=""):
+        value = self.get(key, default)
+        return value if isinstance(value, str) else default
+
+    def get_int(self, key, default=0):
+        value = self.get(key, default)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    def get_float(self, key, default=0.0):
+        value = self.get(key, default)
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
+    def get_bool(self, key, default=False):
+        value = self.get(key, default)
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+
+    def all(self):
+        with self._lock:
+            self._ensure_loaded()
+            return dict(self._data)
+
+    def set(self, key, value):
+        with self._lock:
+            self._ensure_loaded()
+            if key in self._data and self._data[key] == value:
+                return # Nothing to notify or write
+            self._data[key] = value
+            self._dirty = True
+            self._schedule_save()
+        self._notify(key, value)
+
+    def subscribe(self, callback, key=None):
+        """Calls callback(key, value) after a change of `key` (or of any key), from the changing thread."""
+        with self._lock:
+            self._listeners.setdefault(key, []).append(callback)
+
+    def unsubscribe(self, callback, key=None):
+        with self._lock:
+            if callback in self._listeners.get(key, []):
+                self._listeners[key].remove(callback)
+
+    def _notify(self, key, value):
+        with self._lock:
+            callbacks = self._listeners.get(key, []) + self._listeners.get(None, [])
+        for callback in callbacks:
+            try:
+                callback(key, value)
+            except Exception:
+                pass # A broken listener must not break the setter
+
+    def _schedule_save(self):
+        # Every change pushes the deadline back, so a burst of changes ends in a single write
+        self._save_due = time.monotonic() + self.save_delay
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_behind, daemon=True)
+            self._writer.start()
+
+    def _write_behind(self):
+        with self._lock:
+            while self._dirty and self._writable:
+                remaining = self._save_due - time.monotonic()
+                if remaining > 0:
+                    self._save_condition.wait(remaining)
+                    continue
+                try:
+                    self.flush()
+                except OSError:
+                    break # Retried with the next change or at exit
+            self._writer = None
+
+    def flush(self):
+        """Writes pending changes now."""
+        with self._lock:
+            if not self._dirty or not self._writable:
+                return
+            write_atomic(self.path, json.dumps(self._data, indent=4))
+            self._dirty = False
+            self._mtime = os.path.getmtime(self.path) # Our own write is not an external edit
+
+    def reload(self):
+        """Rereads the file if it changed on disk and notifies listeners about changed keys."""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                return
+            if mtime == self._mtime or (self._dirty and self._writable):
+                return # Unchanged, or our pending changes win
+            data, mtime = self._read_file()
+            if data is None:
+                return
+            self._mtime = mtime
+            if not self._writable:
+                # The file is readable again; changes made meanwhile are applied on top of it
+                data.update(self._data)
+                self._writable = True
+                if self._dirty:
+                    self._schedule_save()
+            changed = {key: value for key, value in data.items() if self._data.get(key) != value}
+            self._data = data
+        for key, value in changed.items():
+            self._notify(key, value)
+
+    def start_watching(self):
+        """Polls the file for edits made outside the app until stop_watching(); called by the tray app."""
+        with self._lock:
+            self._ensure_loaded()
+            if not self.watch_interval or (self._watcher is not None and self._watcher.is_alive()):
+                return
+            self._stop_watching.clear()
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+            self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_watching.set()
+
+    def _watch(self):
+        while not self._stop_watching.wait(self.watch_interval):
+            self.reload()
+
+
+store = SettingsStore()
+atexit.register(store.flush) # Don't lose a change made within the debounce delay before quitting
+
 
 def load_settings():
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+    return store.all()
 
 def save_settings(settings):
-    with open(SETTINGS_FILE, 'w') as f:
-        json.dump(settings, f, indent=4)
+    for key, value in settings.items():
+        store.set(key, value)
+    store.flush()
 
 def get_setting(key, default=None):
-    settings = load_settings()
-    return settings.get(key, default)
+    return store.get(key, default)
 
 def set_setting(key, value):
-    settings = load_settings()
-    settings[key] = value
-    save_settings(settings)
+    store.set(key, value)
@@ -1,7 +1,14 @@
+import sys
+
 import numpy as np
 from PyQt5 import QtWidgets, QtGui, QtCore
 import pyqtgraph as pg # pyqtgraph is better suited for plotting scientific data like spectra
 
+from src.config import (SPECTRUM_CHUNK_SIZE, SPECTRUM_AVERAGED_FRAMES, SPECTRUM_REFRESH_MS, SPECTROGRAM_HISTORY_SECONDS,
+                        SPECTROGRAM_FLOOR_DB, SPECTROGRAM_CEILING_DB)
+from src.spectrogram import SpectrogramHistory
+from src.spectrum_analyzer import SpectrumAnalyzer, PeakHold
+
 class SpectralAnalyzerWidget(QtWidgets.QWidget):
     spectrum_data_ready = QtCore.pyqtSignal(np.ndarray)
 
@@ -13,6 +20,34 @@ class SpectralAnalyzerWidget(QtWidgets.QWidget):
         self.layout = QtWidgets.QVBoxLayout()
         self.setLayout(self.layout)
 
+        # Switches between the instantaneous spectrum and the scrolling spectrogram
+        button_style = """
+            QPushButton {
+                background-color: transparent;
+                border: 1px solid #ff9800; /* Orange border */
+                color: white;
+                padding: 5px 10px;
+                font-size: 8pt;
+                border-radius: 5px;
+            }
+            QPushButton:checked {
+                background-color: rgba(255, 152, 0, 0.4);
+            }
+        """
+        self.waterfall_button = QtWidgets.QPushButton("Wasserfall", self)
+        self.waterfall_button.setCheckable(True)
+        self.waterfall_button.setStyleSheet(button_style)
+        self.waterfall_button.toggled.connect(self.set_waterfall_mode)
+        # Folds the bins into mel bands with a peak-hold line: far fewer points and easier to read
+        self.band_button = QtWidgets.QPushButton("Bänder", self)
+        self.band_button.setCheckable(True)
+        self.band_button.setStyleSheet(button_style)
+        self.band_button.toggled.connect(self.set_band_mode)
+        mode_layout = QtWidgets.QHBoxLayout()
+        mode_layout.addWidget(self.band_button)
+        mode_layout.addWidget(self.waterfall_button)
+        self.layout.addLayout(mode_layout)
+
         # Use pyqtgraph for plotting
         self.plot_widget = pg.PlotWidget()
         self.layout.addWidget(self.plot_widget)
@@ -35,71 +70,115 @@ class SpectralAnalyzerWidget(QtWidgets.QWidget):
 
         # Create a plot item for the spectrum line
         self.spectrum_curve = self.plot_widget.plot(pen=pg.mkPen(color='#ff9800', width=2)) # Orange line
+        self.peak_curve = self.plot_widget.plot(pen=pg.mkPen(color='#ffe0b2', width=1)) # Peak hold, band mode only
+        self.peak_hold = PeakHold()
+
+        # Waterfall view: time on the x axis, frequency on the y axis, level as colour
+        self.waterfall_widget = pg.PlotWidget()
+        self.waterfall_widget.setBackground('k')
+        self.waterfall_widget.setTitle("Spektrogramm", color="#ff9800", size="12pt")
+        self.waterfall_widget.setLabel('left', 'Frequency (Hz)', **styles)
+        self.waterfall_widget.setLabel('bottom', 'Time (s)', **styles)
+        self.waterfall_image = pg.ImageItem(axisOrder='col-major') # image[time, frequency]
+        self.waterfall_image.setLookupTable(pg.colormap.get('inferno').getLookupTable(nPts=256))
+        self.waterfall_widget.addItem(self.waterfall_image)
+        self.waterfall_widget.hide()
+        self.layout.addWidget(self.waterfall_widget)
+        self.history = None # Allocated on the first spectrum, once the bin count is known
+        self._waterfall_rect = None
 
         self.spectrum_data_ready.connect(self.update_plot)
 
-        self.sample_rate = 44100 # Default sample rate, will be updated from config
-        self.chunk_size = 1024 # Default chunk size, can be adjusted
+        # Window, bins, weighting and display range are planned here, not on every frame
+        self.analyzer = SpectrumAnalyzer(sample_rate=44100, chunk_size=SPECTRUM_CHUNK_SIZE) # Defaults; updated via the setters
+
+        # Live input: polled at a fixed rate instead of one signal per audio block
+        self.feed = None
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setInterval(SPECTRUM_REFRESH_MS)
+        self.refresh_timer.timeout.connect(self._poll_feed)
+
+    @property
+    def sample_rate(self):
+        return self.analyzer.sample_rate
+
+    @property
+    def chunk_size(self):
+        return self.analyzer.chunk_size
 
     def set_sample_rate(self, sample_rate):
-        self.sample_rate = sample_rate
+        self.analyzer.set_sample_rate(sample_rate)
 
     def set_chunk_size(self, chunk_size):
-        self.chunk_size = chunk_size
+        self.analyzer.set_chunk_size(chunk_size)
+
+    def attach_feed(self, feed):
+        """Displays the newest audio of a SpectrumFeed while the window is visible."""
+        self.feed = feed
+        self.set_sample_rate(feed.samplerate)
+        if self.isVisible():
+            self.feed.enabled = True
+            self.refresh_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.feed:
+            self.feed.enabled = True
+            self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+        if self.feed:
+            self.feed.enabled = False # The audio callback stops copying while nobody looks
+
+    def _poll_feed(self):
+        hop = self.analyzer.hop
+        samples = self.feed.latest(self.chunk_size + (SPECTRUM_AVERAGED_FRAMES - 1) * hop)
+        if samples is not None: # Nothing new, e.g. while not recording
+            self.update_plot(samples)
+
+    def set_waterfall_mode(self, enabled):
+        self.plot_widget.setVisible(not enabled)
+        self.waterfall_widget.setVisible(enabled)
+        if enabled and self.history is not None:
+            self._render_waterfall()
+
+    def set_band_mode(self, enabled):
+        self.peak_hold = PeakHold() # Peaks of the other mode don't apply
+        self.peak_curve.setData([], [])
+
+    def _ensure_history(self):
+        frequencies = self.analyzer.frequencies
+        if self.history is None or self.history.bins != len(frequencies):
+            # A new sample rate or frame size changes the bins, which starts a new history
+            columns = int(SPECTROGRAM_HISTORY_SECONDS * 1000 / SPECTRUM_REFRESH_MS)
+            self.history = SpectrogramHistory(columns, len(frequencies))
+            seconds = columns * SPECTRUM_REFRESH_MS / 1000
+            self._waterfall_rect = QtCore.QRectF(-seconds, frequencies[0], seconds, frequencies[-1] - frequencies[0])
+
+    def _render_waterfall(self):
+        # Fixed levels, so pyqtgraph doesn't scan the whole image for its range every frame
+        self.waterfall_image.setImage(self.history.image(), autoLevels=False, levels=(SPECTROGRAM_FLOOR_DB, SPECTROGRAM_CEILING_DB))
+        self.waterfall_image.setRect(self._waterfall_rect) # Seconds before now and Hz; only valid once an image is set
 
     @QtCore.pyqtSlot(np.ndarray)
     def update_plot(self, audio_chunk):
-        # Perform FFT on the audio chunk
-        # Ensure the chunk is the correct size, pad with zeros if necessary
-        if len(audio_chunk) < self.chunk_size:
-             padded_chunk = np.pad(audio_chunk, (0, self.chunk_size - len(audio_chunk)), 'constant')
+        # Input longer than one frame is averaged over overlapping frames; shorter input is zero-padded
+        # One FFT pass per frame; the dB spectrum and the bands are both derived from it
+        magnitude = self.analyzer.magnitude(audio_chunk)
+        spectrum_db = self.analyzer.spectrum_db(magnitude)
+        # The history is always kept, so switching to the waterfall shows the whole dictation so far
+        self._ensure_history()
+        self.history.push(spectrum_db)
+        if self.waterfall_button.isChecked():
+            self._render_waterfall()
+        elif self.band_button.isChecked():
+            band_db = self.analyzer.band_db(magnitude)
+            self.spectrum_curve.setData(self.analyzer.band_frequencies, band_db)
+            self.peak_curve.setData(self.analyzer.band_frequencies, self.peak_hold.update(band_db))
         else:
-             padded_chunk = audio_chunk[:self.chunk_size]
-
-        # Apply a window function (e.g., Hann window)
-        window = np.hanning(len(padded_chunk))
-        windowed_chunk = padded_chunk * window
-
-        # Perform FFT
-        fft_result = np.fft.fft(windowed_chunk)
-        # Get the magnitude of the positive frequency components
-        spectrum_magnitude = np.abs(fft_result[:len(fft_result)//2])
-
-        # Convert to dB scale (add a small value to avoid log(0))
-        spectrum_db = 20 * np.log10(spectrum_magnitude + 1e-9)
-
-        # Create frequency bins
-        frequencies = np.fft.fftfreq(len(fft_result), 1/self.sample_rate)[:len(fft_result)//2]
-
-        # Apply frequency-dependent weighting for sensitivity adjustment
-        # Normalize frequencies to a 0-1 range for weighting calculation
-        max_freq = self.sample_rate / 2
-        normalized_frequencies = frequencies / max_freq
-
-        # Create a weighting curve: e.g., linear or exponential.
-        # A simple linear weighting: low frequencies get less weight, high frequencies get more.
-        # You can adjust the 'start_weight' and 'end_weight' to fine-tune sensitivity.
-        # Using an exponential weighting for a more aggressive curve.
-        start_weight = 0.001 # Very low sensitivity at low frequencies
-        end_weight = 100.0   # Very high sensitivity at high frequencies
-
-        # Exponential weighting curve: starts at start_weight, ends at end_weight
-        # This provides a much steeper curve than linear weighting.
-        weighting_curve = np.exp(normalized_frequencies * np.log(end_weight / start_weight)) * start_weight
-
-        # Apply the weighting to the magnitude before converting to dB
-        weighted_spectrum_magnitude = spectrum_magnitude * weighting_curve
-        spectrum_db = 20 * np.log10(weighted_spectrum_magnitude + 1e-9)
-
-        # Filter out very low frequencies to "truncate" them from display
-        min_display_frequency = 80 # Hz, adjust as needed. Common voice fundamental is above this.
-        valid_indices = frequencies >= min_display_frequency
-
-        filtered_frequencies = frequencies[valid_indices]
-        filtered_spectrum_db = spectrum_db[valid_indices]
-
-        # Update the plot with filtered data
-        self.spectrum_curve.setData(filtered_frequencies, filtered_spectrum_db)
+            self.spectrum_curve.setData(self.analyzer.frequencies, spectrum_db)
 
 if __name__ == '__main__':
     app = QtWidgets.QApplication([])
@@ -0,0 +1,32 @@
+import numpy as np
+
+from src.config import SPECTROGRAM_FLOOR_DB
+
+
+class SpectrogramHistory:
+    """Fixed-size history of spectra for a waterfall display, oldest first.
+
+    Every spectrum is written twice into a buffer of twice the history length, once at its ring
+    position and once a full history later. The last `columns` spectra are therefore always one
+    contiguous slice, so the display gets a view each frame without any copy or reallocation.
+    Memory is fixed at 2 * columns * bins float32 values.
+    """
+
+    def __init__(self, columns, bins, floor_db=SPECTROGRAM_FLOOR_DB):
+        self.columns = columns
+        self.bins = bins
+        self._data = np.full((2 * columns, bins), floor_db, dtype=np.float32)
+        self._next = 0 # Ring position of the next spectrum
+
+    def push(self, spectrum):
+        self._data[self._next] = spectrum
+        self._data[self._next + self.columns] = spectrum
+        self._next = (self._next + 1) % self.columns
+
+    def image(self):
+        """The history as a (columns, bins) view, oldest spectrum first; valid until the next push."""
+        return self._data[self._next:self._next + self.columns]
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
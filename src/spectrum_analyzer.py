@@ -0,0 +1,141 @@
+import time
+
+import numpy as np
+from scipy import sparse
+
+from src.config import (SPECTRUM_MIN_FREQUENCY, SPECTRUM_START_WEIGHT, SPECTRUM_END_WEIGHT, SPECTRUM_OVERLAP, SPECTRUM_BANDS,
+                        SPECTRUM_BAND_SCALE, SPECTRUM_PEAK_DECAY_DB_PER_SECOND)
+
+
+def _hz_to_mel(frequency):
+    return 2595 * np.log10(1 + frequency / 700)
+
+
+def _mel_to_hz(mel):
+    return 700 * (10 ** (mel / 2595) - 1)
+
+
+def band_edges(low, high, bands, scale=SPECTRUM_BAND_SCALE):
+    """Band boundaries between `low` and `high` Hz, evenly spaced on a mel or log scale."""
+    if scale == "mel":
+        return _mel_to_hz(np.linspace(_hz_to_mel(low), _hz_to_mel(high), bands + 1))
+    if scale == "log":
+        return np.geomspace(low, high, bands + 1)
+    raise ValueError(f"Unbekannte Bandskala: {scale}")
+
+
+class SpectrumAnalyzer:
+    """Weighted dB spectrum of audio frames, with everything that only depends on the sizes precomputed.
+
+    The window, frequency bins, weighting curve and display range are planned once per sample rate and
+    frame size. Single frames use one real FFT; longer input is split into overlapping frames whose power
+    spectra are averaged (Welch's method), which gives a steadier display.
+
+    For the band display, the bins are folded into mel- or log-spaced bands by a sparse matrix that is
+    planned along with the rest. A display that needs both views computes magnitude() once and derives
+    spectrum_db() and band_db() from it, so the bands cost one matrix-vector product and no extra FFT.
+    """
+
+    def __init__(self, sample_rate=44100, chunk_size=1024, overlap=SPECTRUM_OVERLAP, min_frequency=SPECTRUM_MIN_FREQUENCY,
+                 start_weight=SPECTRUM_START_WEIGHT, end_weight=SPECTRUM_END_WEIGHT, bands=SPECTRUM_BANDS,
+                 band_scale=SPECTRUM_BAND_SCALE):
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.min_frequency = min_frequency
+        self.start_weight = start_weight
+        self.end_weight = end_weight
+        self.bands = bands
+        self.band_scale = band_scale
+        self._plan()
+
+    def set_sample_rate(self, sample_rate):
+        self.sample_rate = sample_rate
+        self._plan()
+
+    def set_chunk_size(self, chunk_size):
+        self.chunk_size = chunk_size
+        self._plan()
+
+    def _plan(self):
+        n = self.chunk_size
+        self.window = np.hanning(n)
+        # The positive frequencies without the Nyquist bin, as displayed so far
+        all_frequencies = np.fft.rfftfreq(n, 1 / self.sample_rate)[:n // 2]
+        # Frequencies ascend, so the display range is a slice rather than a mask
+        first_bin = int(np.searchsorted(all_frequencies, self.min_frequency))
+        self._bins = slice(first_bin, n // 2)
+        self.frequencies = all_frequencies[self._bins]
+        # Exponential weighting curve from start_weight at 0 Hz to end_weight at Nyquist
+        normalized_frequencies = self.frequencies / (self.sample_rate / 2)
+        self.weighting = np.exp(normalized_frequencies * np.log(self.end_weight / self.start_weight)) * self.start_weight
+        self.hop = max(1, int(n * (1 - self.overlap)))
+        self._plan_bands()
+
+    def _plan_bands(self):
+        edges = band_edges(self.frequencies[0], self.sample_rate / 2, self.bands, self.band_scale)
+        band_of_bin = np.clip(np.searchsorted(edges, self.frequencies, side='right') - 1, 0, self.bands - 1)
+        # Low bands can be narrower than the bin spacing; bands without a bin are left out
+        used_bands, row_of_bin, bins_per_band = np.unique(band_of_bin, return_inverse=True, return_counts=True)
+        # Each row averages the power of its bins
+        self._band_matrix = sparse.csr_matrix((1.0 / bins_per_band[row_of_bin], (row_of_bin, np.arange(len(self.frequencies)))),
+                                              shape=(len(used_bands), len(self.frequencies)))
+        self.band_frequencies = np.sqrt(edges[used_bands] * edges[used_bands + 1]) # Geometric band centres
+
+    def _to_db(self, magnitude):
+        return 20 * np.log10(magnitude * self.weighting + 1e-9)
+
+    def _magnitude(self, frame):
+        frame = np.asarray(frame, dtype=np.float64).reshape(-1)[:self.chunk_size]
+        if len(frame) < self.chunk_size:
+            frame = np.pad(frame, (0, self.chunk_size - len(frame)))
+        return np.abs(np.fft.rfft(frame * self.window)[self._bins])
+
+    def magnitude(self, samples):
+        """Welch-averaged magnitude spectrum of all overlapping frames in `samples`."""
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1)
+        if len(samples) <= self.chunk_size:
+            return self._magnitude(samples)
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.chunk_size)[::self.hop]
+        spectra = np.fft.rfft(frames * self.window, axis=1)[:, self._bins]
+        # Averaging powers rather than magnitudes, as Welch's method does
+        return np.sqrt(np.mean(spectra.real ** 2 + spectra.imag ** 2, axis=0))
+
+    def analyze(self, frame):
+        """Spectrum of one frame; shorter frames are zero-padded, longer ones truncated."""
+        return self._to_db(self._magnitude(frame))
+
+    def spectrum_db(self, magnitude):
+        """Weighted dB spectrum of a magnitude() result."""
+        return self._to_db(magnitude)
+
+    def band_db(self, magnitude):
+        """A magnitude() result folded into the bands at band_frequencies, in dB."""
+        weighted_power = (magnitude * self.weighting) ** 2
+        return 10 * np.log10(self._band_matrix @ weighted_power + 1e-18)
+
+    def analyze_frames(self, samples):
+        """Welch-averaged spectrum of all overlapping frames in `samples`."""
+        return self.spectrum_db(self.magnitude(samples))
+
+    def analyze_bands(self, samples):
+        """Like analyze_frames, folded into the bands at band_frequencies."""
+        return self.band_db(self.magnitude(samples))
+
+
+class PeakHold:
+    """Peak-hold line over a spectrum: follows rises at once and falls back at a fixed rate in dB per second."""
+
+    def __init__(self, decay_db_per_second=SPECTRUM_PEAK_DECAY_DB_PER_SECOND):
+        self.decay_db_per_second = decay_db_per_second
+        self.peaks = None
+        self._last_update = None
+
+    def update(self, spectrum_db):
+        now = time.monotonic()
+        if self.peaks is None or len(self.peaks) != len(spectrum_db):
+            self.peaks = np.array(spectrum_db, dtype=np.float64) # (Re)started, e.g. after the band count changed
+        else:
+            self.peaks = np.maximum(spectrum_db, self.peaks - self.decay_db_per_second * (now - self._last_update))
+        self._last_update = now
+        return self.peaks
@@ -0,0 +1,47 @@
+import numpy as np
+
+from src.config import SAMPLERATE, SPECTRUM_FEED_SECONDS
+
+
+class SpectrumFeed:
+    """Ring buffer between the audio callback (single producer) and the spectrum display (single consumer).
+
+    The callback never takes a lock or touches Qt: it copies its block into the ring and then advances
+    a sample counter. The display polls at its own rate and only ever reads the newest samples, so
+    frames it was too slow for are dropped instead of queueing up.
+    """
+
+    def __init__(self, samplerate=SAMPLERATE, seconds=SPECTRUM_FEED_SECONDS):
+        self.samplerate = samplerate
+        self._ring = np.zeros(int(samplerate * seconds), dtype=np.int16)
+        self._written = 0 # Total samples ever written; published after the copy, so readers see complete data
+        self._last_read = 0
+        self.enabled = False # Set by the display while it is visible; the callback skips the copy otherwise
+
+    def write(self, block):
+        # Called from the audio callback
+        if not self.enabled:
+            return
+        samples = block.reshape(-1)
+        capacity = len(self._ring)
+        if len(samples) > capacity:
+            samples = samples[-capacity:]
+        start = self._written % capacity
+        first = min(len(samples), capacity - start)
+        self._ring[start:start + first] = samples[:first]
+        self._ring[:len(samples) - first] = samples[first:]
+        self._written += len(samples)
+
+    def latest(self, frames):
+        """The newest `frames` samples, or None if nothing was written since the last call."""
+        written = self._written
+        if written == self._last_read or written < frames:
+            return None
+        capacity = len(self._ring)
+        frames = min(frames, capacity)
+        indices = np.arange(written - frames, written) % capacity
+        samples = self._ring[indices]
+        if self._written - (written - frames) > capacity:
+            return None # The producer lapped us while copying; the next poll gets a clean frame
+        self._last_read = written
+        return samples
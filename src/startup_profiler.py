@@ -0,0 +1,113 @@
+import builtins
+import contextlib
+import importlib.util
+import sys
+import threading
+import time
+
+PROFILE_FLAG = "--profile-startup"
+REPORT_FILENAME = "startup_profile.txt" # Used when there is no console, e.g. when started with pythonw at login
+
+
+class StartupProfiler:
+    """Measures how long each module takes to import and each startup step takes to run.
+
+    Imports are timed through a wrapper around builtins.__import__, so it has to be installed before
+    the modules of interest are imported. Times are inclusive of nested imports; the report also
+    shows the self time, i.e. without the nested imports that were new at that point.
+
+    Only imports on the thread that installed the profiler are timed. Background threads (the hotkey
+    listener, the local model warm-up) import concurrently, and their time is not what startup waits for.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.imports = [] # (name, depth, inclusive seconds, self seconds) in completion order
+        self.steps = [] # (label, seconds)
+        self._stack = [] # Child time accumulated per open import, main thread only
+        self._original_import = None
+        self._thread = None
+
+    @classmethod
+    def from_argv(cls, argv):
+        """Returns an installed profiler if the flag is on the command line, otherwise None."""
+        if PROFILE_FLAG not in argv:
+            return None
+        argv.remove(PROFILE_FLAG) # Qt must not see it
+        profiler = cls()
+        profiler.install()
+        return profiler
+
+    def install(self):
+        self._thread = threading.get_ident()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _new_module(self, name, globals, fromlist, level):
+        try:
+            if level:
+                name = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__"))
+        except (ImportError, ValueError):
+            return None
+        if name not in sys.modules:
+            return name
+        module = sys.modules[name]
+        for attribute in fromlist or ():
+            if attribute != "*" and not hasattr(module, attribute):
+                return f"{name}.{attribute}" # from package import submodule
+        return None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if threading.get_ident() != self._thread:
+            return self._original_import(name, globals, locals, fromlist, level)
+        label = self._new_module(name, globals, fromlist, level)
+        if label is None:
+            return self._original_import(name, globals, locals, fromlist, level)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.imports.append((label, len(self._stack), elapsed, elapsed - children))
+
+    @contextlib.contextmanager
+    def step(self, label):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((label, time.perf_counter() - start))
+
+    def report(self, limit=25):
+        total = time.perf_counter() - self.start
+        lines = [f"Startup: {total * 1000:.0f} ms until the event loop ran", "", "Top-level imports (inclusive):"]
+        for name, depth, inclusive, _ in self.imports:
+            if depth == 0:
+                lines.append(f"  {inclusive * 1000:8.1f} ms  {name}")
+        lines += ["", f"Slowest modules (self time, top {limit}):"]
+        for name, _, _, own in sorted(self.imports, key=lambda entry: entry[3], reverse=True)[:limit]:
+            lines.append(f"  {own * 1000:8.1f} ms  {name}")
+        lines += ["", "Construction:"]
+        for label, seconds in self.steps:
+            lines.append(f"  {seconds * 1000:8.1f} ms  {label}")
+        text = "\n".join(lines)
+        if sys.stdout is not None:
+            print(text)
+        else:
+            with open(REPORT_FILENAME, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        return text
+
+
+def profile_step(profiler, label):
+    """Times a block if profiling is enabled; a no-op otherwise."""
+    return profiler.step(label) if profiler else contextlib.nullcontext()
@@ -1,9 +1,17 @@
+import time
+from collections import deque
+
 import numpy as np
 from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtWidgets import QGraphicsOpacityEffect
 
+from src.config import FIREFLY_COUNT, FIREFLY_SHADES, ANIMATION_ACTIVE_INTERVAL_MS, ANIMATION_IDLE_INTERVAL_MS
+from src.fireflies import FireflySwarm
+
+IDLE_FIREFLY_COLOR = QtGui.QColor(255, 165, 0) # Orange; any other colour means recording or processing
+
 class StatusWindow(QtWidgets.QWidget):
-    def __init__(self):
+    def __init__(self, num_fireflies=FIREFLY_COUNT):
         super().__init__()
         # Remove native title bar
         self.setWindowFlags(QtCore.Qt.FramelessWindowHint | QtCore.Qt.WindowStaysOnTopHint | QtCore.Qt.Tool)
@@ -82,9 +90,16 @@ class StatusWindow(QtWidgets.QWidget):
             }
         """)
 
+        # Number of recordings waiting for or in transcription; hidden while the queue is empty
+        self.queue_label = QtWidgets.QLabel("", self)
+        self.queue_label.setStyleSheet("color: #ff9800; font-family: Consolas, monospace; font-size: 9pt;")
+        self.queue_label.hide()
+
         button_layout = QtWidgets.QHBoxLayout()
         button_layout.addWidget(self.record_button)
         button_layout.addStretch(1)
+        button_layout.addWidget(self.queue_label)
+        button_layout.addStretch(1)
         button_layout.addWidget(self.eleven_labs_button)
         content_layout.addLayout(button_layout)
 
@@ -93,27 +108,31 @@ class StatusWindow(QtWidgets.QWidget):
         # Animation properties (existing firefly code)
         self.animation_phase = 0.0
         self.animation_speed = 0.005 # Reduced for slower overall animation
-        self.num_fireflies = 50
-        self.fireflies = []
-        for i in range(self.num_fireflies):
-            self.fireflies.append({
-                'x': np.random.uniform(0, self.width()),
-                'y': np.random.uniform(0, self.height()),
-                'size': np.random.uniform(2, 8),
-                'color_offset': np.random.uniform(0, 1),
-                'phase_offset': np.random.uniform(0, 2 * np.pi),
-                'speed_factor': np.random.uniform(0.5, 1.5)
-            })
+        self.num_fireflies = num_fireflies
+        self.fireflies = FireflySwarm(self.num_fireflies, self.width(), self.height())
+        self._firefly_shades = self.fireflies.shades(FIREFLY_SHADES)
+
+        # Rendering cache: the gradient is rendered once per size, the fireflies once per colour
+        self._background = None
+        self._atlas = None
+        self._atlas_key = None
+        self.paint_times = deque(maxlen=100) # Seconds per paintEvent
 
         self.current_firefly_color = QtGui.QColor(255, 165, 0)
         self.target_firefly_color = QtGui.QColor(255, 165, 0)
-        self.color_transition_timer = QtCore.QTimer(self)
-        self.color_transition_timer.timeout.connect(self.update_firefly_color)
+        self.color_transitioning = False # Advanced by the animation frames, so it needs no timer of its own
         self.color_transition_speed = 5
+        self._busy = False
 
+        # Runs only while the window is visible: fast while something happens, slow when idle
         self.animation_timer = QtCore.QTimer(self)
         self.animation_timer.timeout.connect(self.animate_background)
-        self.animation_timer.start(20) # Reverted interval to 20ms for balanced smoothness and speed
+        self._last_frame = time.monotonic()
+
+        # Wakeup and CPU-time counters for animation_stats()
+        self._wakeups = 0
+        self._stats_since = time.monotonic()
+        self._stats_cpu = time.process_time()
 
     # Mouse events for dragging the custom title bar
     def title_bar_mouse_press(self, event):
@@ -151,6 +170,11 @@ class StatusWindow(QtWidgets.QWidget):
         # Start the animation after 20 seconds
         QtCore.QTimer.singleShot(20000, self.fade_animation.start)
 
+    @QtCore.pyqtSlot(int)
+    def set_queue_depth(self, depth):
+        self.queue_label.setText(f"⏳ {depth} in Arbeit")
+        self.queue_label.setVisible(depth > 0)
+
     @QtCore.pyqtSlot()
     def _activate_window(self):
         self.activateWindow()
@@ -158,7 +182,9 @@ class StatusWindow(QtWidgets.QWidget):
     @QtCore.pyqtSlot(QtGui.QColor)
     def set_firefly_color(self, color):
         self.target_firefly_color = color
-        self.color_transition_timer.start(20)
+        self.color_transitioning = True
+        self._busy = color.rgb() != IDLE_FIREFLY_COLOR.rgb()
+        self._update_animation_rate()
 
     def update_firefly_color(self):
         r = self.current_firefly_color.red()
@@ -174,66 +200,134 @@ class StatusWindow(QtWidgets.QWidget):
         b += (target_b - b) / self.color_transition_speed
 
         self.current_firefly_color = QtGui.QColor(int(r), int(g), int(b))
-        self.update()
+        # No repaint of its own; the animation timer repaints every frame anyway
 
-        if abs(r - target_r) < 1 and abs(g - target_g) < 1 and abs(b - target_b) < 1:
-            self.color_transition_timer.stop()
+        # Within one step of the target the truncating int() would stall short of it, so snap there
+        if all(abs(value - target) < self.color_transition_speed for value, target in ((r, target_r), (g, target_g), (b, target_b))):
+            self.color_transitioning = False
             self.current_firefly_color = self.target_firefly_color
+            self._update_animation_rate()
+
+    def _update_animation_rate(self):
+        if not self.isVisible() or self.isMinimized():
+            self.animation_timer.stop() # Nothing to see, so no wakeups at all
+            return
+        interval = ANIMATION_ACTIVE_INTERVAL_MS if self._busy or self.color_transitioning else ANIMATION_IDLE_INTERVAL_MS
+        if not self.animation_timer.isActive():
+            self._last_frame = time.monotonic() # Don't make up for the time the window was hidden
+            self.animation_timer.start(interval)
+        elif self.animation_timer.interval() != interval:
+            self.animation_timer.setInterval(interval)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._update_animation_rate()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_animation_rate()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QtCore.QEvent.WindowStateChange:
+            self._update_animation_rate() # Minimized or restored
 
     def animate_background(self):
-        self.animation_phase += self.animation_speed
+        self._wakeups += 1
+        now = time.monotonic()
+        # Motion is scaled to the elapsed time, so fireflies move at the same speed at any frame rate
+        frames = min((now - self._last_frame) * 1000 / ANIMATION_ACTIVE_INTERVAL_MS, 10.0)
+        self._last_frame = now
+
+        self.animation_phase += self.animation_speed * frames
         if self.animation_phase > 2 * np.pi:
             self.animation_phase -= 2 * np.pi
 
-        for firefly in self.fireflies:
-            firefly['x'] += np.sin(self.animation_phase * firefly['speed_factor'] * 0.1) * 0.1 # Further reduced movement per frame
-            firefly['y'] += np.cos(self.animation_phase * firefly['speed_factor'] * 0.125) * 0.125 # Further reduced movement per frame
-
-            if firefly['x'] < -firefly['size']: firefly['x'] = self.width() + firefly['size']
-            if firefly['x'] > self.width() + firefly['size']: firefly['x'] = -firefly['size']
-            if firefly['y'] < -firefly['size']: firefly['y'] = self.height() + firefly['size']
-            if firefly['y'] > self.height() + firefly['size']: firefly['y'] = -firefly['size']
-
+        if self.color_transitioning:
+            self.update_firefly_color()
+        self.fireflies.step(self.animation_phase, self.width(), self.height(), frames)
         self.update()
 
-    def paintEvent(self, event):
-        painter = QtGui.QPainter(self)
-        painter.setRenderHint(QtGui.QPainter.Antialiasing)
-
-        # Draw black background with a darker gradient for the main content area
-        # This will now draw *below* the title bar
+    def animation_stats(self):
+        """Animation wakeups per second and process CPU time (in percent of one core) since the last call."""
+        now = time.monotonic()
+        cpu = time.process_time()
+        elapsed = max(now - self._stats_since, 1e-9)
+        stats = {
+            "wakeups_per_second": self._wakeups / elapsed,
+            "cpu_percent": 100 * (cpu - self._stats_cpu) / elapsed,
+            "interval_ms": self.animation_timer.interval() if self.animation_timer.isActive() else 0,
+        }
+        self._wakeups = 0
+        self._stats_since = now
+        self._stats_cpu = cpu
+        return stats
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._background = None # Re-rendered for the new size on the next paint
+
+    def _render_background(self):
+        ratio = self.devicePixelRatioF()
+        background = QtGui.QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        background.setDevicePixelRatio(ratio)
+        background.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(background)
+        # Black background with a darker gradient for the main content area, below the title bar
         gradient = QtGui.QRadialGradient(self.width() / 2, self.height() / 2, max(self.width(), self.height()) / 2)
         gradient.setColorAt(0, QtGui.QColor(0, 0, 0))
         gradient.setColorAt(1, QtGui.QColor(10, 10, 10))
-        
-        # Only paint the area below the title bar
-        content_rect = self.rect().adjusted(0, self.title_bar.height(), 0, 0)
-        painter.fillRect(content_rect, gradient)
-
-        # Draw fireflies only in the content area
-        painter.setClipRect(content_rect) # Clip fireflies to content area
-        for firefly in self.fireflies:
-            pulse_factor = (np.sin(self.animation_phase * firefly['speed_factor'] + firefly['phase_offset']) + 1) / 2.0
-
-            # Introduce more nuanced orange variations using HSV
-            h, s, v, a = self.current_firefly_color.getHsv()
-
-            # Vary saturation and value based on color_offset
-            # color_offset is between 0 and 1
-            # Let's make saturation vary from 0.5 to 1.0 of original (wider range)
-            # Let's make value vary from 0.6 to 1.0 of original (wider range)
-            new_s = int(s * (0.5 + firefly['color_offset'] * 0.5)) # Increased range
-            new_v = int(v * (0.6 + firefly['color_offset'] * 0.4)) # Increased range
-
-            # Ensure values are within valid HSV ranges (0-255 for s, v)
-            new_s = max(0, min(255, new_s))
-            new_v = max(0, min(255, new_v))
-
-            firefly_color = QtGui.QColor.fromHsv(h, new_s, new_v, int(255 * (0.3 + pulse_factor * 0.7)))
-
-            painter.setBrush(QtGui.QBrush(firefly_color))
+        painter.fillRect(self.rect().adjusted(0, self.title_bar.height(), 0, 0), gradient)
+        painter.end()
+        return background
+
+    def _sprite_atlas(self):
+        """Pre-rendered fireflies for the current colour: one row per shade, one column per diameter."""
+        key = self.current_firefly_color.rgba()
+        if self._atlas_key != key:
+            cell = FireflySwarm.MAX_SIZE + 2 # One pixel of padding, so neighbouring sprites don't bleed into each other
+            # Kept at a device pixel ratio of 1: fragment source rects are in pixmap pixels
+            atlas = QtGui.QPixmap((FireflySwarm.MAX_SIZE + 1) * cell, FIREFLY_SHADES * cell)
+            atlas.fill(QtCore.Qt.transparent)
+            painter = QtGui.QPainter(atlas)
+            painter.setRenderHint(QtGui.QPainter.Antialiasing)
             painter.setPen(QtCore.Qt.NoPen)
+            # More nuanced orange variations using HSV: saturation 0.5 to 1.0 and value 0.6 to 1.0 of the base colour
+            h, s, v, _ = self.current_firefly_color.getHsv()
+            for shade in range(FIREFLY_SHADES):
+                offset = shade / (FIREFLY_SHADES - 1)
+                painter.setBrush(QtGui.QColor.fromHsv(h, min(255, int(s * (0.5 + offset * 0.5))), min(255, int(v * (0.6 + offset * 0.4)))))
+                for diameter in range(1, FireflySwarm.MAX_SIZE + 1):
+                    painter.drawEllipse(diameter * cell + 1, shade * cell + 1, diameter, diameter)
+            painter.end()
+            self._atlas = atlas
+            self._atlas_key = key
+        return self._atlas
 
-            current_size = firefly['size'] * (0.5 + pulse_factor * 0.5)
-            painter.drawEllipse(int(firefly['x'] - current_size / 2), int(firefly['y'] - current_size / 2), int(current_size), int(current_size))
-        painter.setClipRect(self.rect()) # Reset clip rect
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        painter = QtGui.QPainter(self)
+        if self._background is None:
+            self._background = self._render_background()
+        painter.drawPixmap(0, 0, self._background)
+
+        # Draw fireflies only in the content area, all in one batched blit from the sprite atlas
+        content_rect = self.rect().adjusted(0, self.title_bar.height(), 0, 0)
+        painter.setClipRect(content_rect) # Clip fireflies to content area
+        atlas = self._sprite_atlas()
+        cell = FireflySwarm.MAX_SIZE + 2
+        x, y, diameter, opacity = self.fireflies.sprites(self.animation_phase)
+        # Sprites sit at whole pixels like the ellipses drawn before, so the pulse doesn't blur them
+        left = (x - diameter / 2).astype(int)
+        top = (y - diameter / 2).astype(int)
+        fragments = [
+            QtGui.QPainter.PixmapFragment.create(QtCore.QPointF(l + d / 2, t + d / 2), QtCore.QRectF(d * cell + 1, shade * cell + 1, d, d), 1, 1, 0, o)
+            for l, t, d, shade, o in zip(left.tolist(), top.tolist(), diameter.tolist(), self._firefly_shades.tolist(), opacity.tolist())
+        ]
+        painter.drawPixmapFragments(fragments, atlas)
+        painter.end()
+        self.paint_times.append(time.perf_counter() - start)
+
+    def average_paint_ms(self):
+        """Mean paint time over the last frames, for profiling."""
+        return 1000 * sum(self.paint_times) / len(self.paint_times) if self.paint_times else 0.0
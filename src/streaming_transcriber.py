@@ -0,0 +1,100 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.config import (SAMPLERATE, VAD_FRAME_SECONDS, STREAMING_MIN_SEGMENT_SECONDS, STREAMING_MAX_SEGMENT_SECONDS,
+                        STREAMING_PAUSE_SECONDS, STREAMING_POLL_INTERVAL_SECONDS, STREAMING_MAX_PARALLEL_UPLOADS)
+from src.vad import VadStats, frame_length, frame_rms, speech_frames, trim_silence
+
+
+class StreamingTranscriber:
+    """Cuts a running recording at speech pauses and transcribes the segments in the background.
+
+    The watcher thread polls the capture buffer while F3 is held. Once a segment is long enough
+    and followed by a pause, it is copied out and handed to the transcribe callable. finish()
+    transcribes the remaining tail and stitches all partial texts together in recording order.
+    """
+
+    def __init__(self, capture_buffer, transcribe, samplerate=SAMPLERATE):
+        self._buffer = capture_buffer
+        self._transcribe = transcribe
+        self._samplerate = samplerate
+        self._frame_length = frame_length(samplerate)
+        self._executor = ThreadPoolExecutor(max_workers=STREAMING_MAX_PARALLEL_UPLOADS)
+        self._futures = []
+        self._segment_start = 0
+        self._stop_event = threading.Event()
+        self.vad_stats = VadStats(samplerate=samplerate)
+        self._watcher = threading.Thread(target=self._watch, daemon=True)
+
+    def start(self):
+        self._watcher.start()
+
+    def stop(self):
+        # Must be called before the capture buffer is detached or reset
+        self._stop_event.set()
+        if self._watcher.is_alive():
+            self._watcher.join()
+
+    def cancel(self):
+        self.stop()
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def finish(self, recording):
+        """Transcribes what is left of the detached recording after the last cut and returns the stitched text."""
+        self.stop()
+        self._submit(recording.read(self._segment_start, len(recording)))
+        try:
+            texts = [future.result() for future in self._futures]
+        finally:
+            self._executor.shutdown(wait=False)
+        return " ".join(text.strip() for text in texts if text and text.strip())
+
+    def _submit(self, segment):
+        segment, stats = trim_silence(segment, self._samplerate)
+        self.vad_stats.add(stats)
+        # Segments without any speech would only make Whisper hallucinate
+        if len(segment) == 0:
+            return
+        self._futures.append(self._executor.submit(self._transcribe, segment))
+
+    def _watch(self):
+        while not self._stop_event.wait(STREAMING_POLL_INTERVAL_SECONDS):
+            cut = self._find_cut(len(self._buffer))
+            if cut is not None:
+                self._submit(self._buffer.read(self._segment_start, cut))
+                self._segment_start = cut
+
+    def _find_cut(self, recorded):
+        min_frames = int(STREAMING_MIN_SEGMENT_SECONDS * self._samplerate)
+        if recorded - self._segment_start < min_frames:
+            return None
+
+        # Classify the whole segment, so the VAD's noise floor isn't estimated from speech alone,
+        # but only look for pauses after the minimum segment length
+        audio = self._buffer.read(self._segment_start, recorded)
+        first_frame = min_frames // self._frame_length
+        search_start = self._segment_start + first_frame * self._frame_length
+        quiet = ~speech_frames(audio, self._samplerate)[first_frame:]
+        if len(quiet) == 0:
+            return None
+
+        # Find the last run of quiet frames long enough to count as a pause and cut in its middle
+        pause_frames = max(1, int(STREAMING_PAUSE_SECONDS / VAD_FRAME_SECONDS))
+        padded = np.concatenate(([False], quiet, [False]))
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        run_starts, run_ends = edges[0::2], edges[1::2]
+        long_runs = np.flatnonzero(run_ends - run_starts >= pause_frames)
+        if len(long_runs):
+            run = long_runs[-1]
+            middle = (run_starts[run] + run_ends[run]) // 2
+            return search_start + int(middle) * self._frame_length
+
+        # Nobody pauses forever; cut at the quietest frame so segments stay bounded
+        if recorded - self._segment_start >= STREAMING_MAX_SEGMENT_SECONDS * self._samplerate:
+            rms = frame_rms(audio[search_start - self._segment_start:], self._frame_length)
+            return search_start + int(np.argmin(rms)) * self._frame_length
+        return None
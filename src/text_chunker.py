@@ -0,0 +1,81 @@
+import re
+from collections import deque
+
+from src.config import TTS_FIRST_CHUNK_CHARS, TTS_MAX_CHUNK_CHARS, TTS_CHUNK_GROWTH
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+# Only the whitespace is consumed; closing quotes and brackets stay with their sentence
+SENTENCE_END = re.compile(r'(?:(?<=[.!?…])|(?<=[.!?…]["»«“”)])|(?<=[.!?…]["»«“”)]{2}))\s+')
+# A sentence piece ending like this is an abbreviation or ordinal ("z. B.", "Dr.", "am 3. Mai"), not a sentence
+ABBREVIATION_END = re.compile(r'(?:^|\s)(?:\w|\d+|Dr|Prof|Hr|Fr|Nr|St|Str|bzw|ca|vgl|ggf|evtl|inkl|zzgl|Mio|Mrd|Jh)\.$')
+# Cut after , ; : or before a dash that stands between spaces
+CLAUSE_BREAK = re.compile(r'(?<=[,;:])\s+|\s+(?=[–—-]\s)')
+WHITESPACE = re.compile(r'\s+')
+
+
+def chunk_limit(index, first_chunk_chars=TTS_FIRST_CHUNK_CHARS, max_chunk_chars=TTS_MAX_CHUNK_CHARS, growth=TTS_CHUNK_GROWTH):
+    """Character limit of the chunk at `index`: small at first, then growing up to the hard maximum."""
+    # The exponent is capped, so very long documents don't overflow the float
+    return int(min(max_chunk_chars, first_chunk_chars * growth ** min(index, 32)))
+
+
+def _split_units(text):
+    """Yields (sentence, separator) pairs; the separator is what joins the sentence to the one before it."""
+    for paragraph_index, paragraph in enumerate(PARAGRAPH_BREAK.split(text.strip())):
+        sentences = []
+        for piece in SENTENCE_END.split(WHITESPACE.sub(" ", paragraph).strip()):
+            if sentences and ABBREVIATION_END.search(sentences[-1]):
+                sentences[-1] += " " + piece
+            elif piece:
+                sentences.append(piece)
+        for sentence_index, sentence in enumerate(sentences):
+            yield sentence, "\n\n" if sentence_index == 0 and paragraph_index > 0 else " "
+
+
+def _split_unit(unit, limit):
+    """Splits a sentence that doesn't fit into `limit` at the last clause boundary, else the last word, else hard."""
+    window = unit[:limit + 1]
+    # A boundary very early would produce a uselessly short chunk, so it has to be in the last two thirds
+    clauses = [m for m in CLAUSE_BREAK.finditer(window) if limit // 3 <= m.start() <= limit]
+    if clauses:
+        match = clauses[-1]
+    else:
+        words = [m for m in WHITESPACE.finditer(window) if 0 < m.start() <= limit]
+        match = words[-1] if words else None
+    if match is None:
+        return unit[:limit], unit[limit:]
+    return unit[:match.start()], unit[match.end():]
+
+
+def split_text_into_chunks(text, first_chunk_chars=TTS_FIRST_CHUNK_CHARS, max_chunk_chars=TTS_MAX_CHUNK_CHARS, growth=TTS_CHUNK_GROWTH):
+    """Splits text into TTS chunks whose size ramps up from `first_chunk_chars` to `max_chunk_chars`.
+
+    The first chunk is small so its audio arrives quickly; the later ones are synthesized while earlier
+    ones play and can be larger. Chunks end at paragraph, sentence or clause boundaries where possible
+    and never exceed `max_chunk_chars`.
+    """
+    units = deque(_split_units(text))
+    chunks = []
+    current = ""
+    while units:
+        limit = chunk_limit(len(chunks), first_chunk_chars, max_chunk_chars, growth)
+        unit, separator = units[0]
+        if current and separator == "\n\n" and len(current) >= limit // 2:
+            # A paragraph break is the most natural place for a pause; prefer it over a fuller chunk
+            chunks.append(current)
+            current = ""
+            continue
+        candidate = current + separator + unit if current else unit
+        if len(candidate) <= limit:
+            current = candidate
+            units.popleft()
+        elif current:
+            chunks.append(current)
+            current = ""
+        else:
+            head, tail = _split_unit(unit, limit)
+            chunks.append(head)
+            units[0] = (tail, " ")
+    if current:
+        chunks.append(current)
+    return chunks
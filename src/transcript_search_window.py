@@ -0,0 +1,90 @@
+import datetime
+import time
+
+import pyperclip
+from PyQt5 import QtWidgets, QtCore
+
+SEARCH_DEBOUNCE_MS = 150 # Searches run once typing pauses, not on every keystroke
+
+
+class TranscriptSearchWindow(QtWidgets.QWidget):
+    """Full-text search over the transcript history; double-clicking a hit copies it to the clipboard."""
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.setWindowTitle("Transkripte durchsuchen")
+        self.setGeometry(220, 220, 520, 480)
+        self.setStyleSheet("""
+            QWidget {
+                background-color: #222222; /* Dark background */
+                color: #ffffff; /* White text */
+            }
+            QLineEdit, QListWidget {
+                background-color: #333333;
+                color: #ffffff;
+                border: 1px solid #555555;
+                border-radius: 5px;
+                padding: 5px;
+            }
+            QListWidget::item {
+                padding: 4px 0px;
+                border-bottom: 1px solid #444444;
+            }
+            QListWidget::item:selected {
+                background-color: #ff9800; /* Orange, as the buttons */
+                color: #000000;
+            }
+        """)
+
+        layout = QtWidgets.QVBoxLayout()
+
+        self.search_input = QtWidgets.QLineEdit(self)
+        self.search_input.setPlaceholderText("Suchbegriff eingeben...")
+        self.search_input.textChanged.connect(self._schedule_search)
+        layout.addWidget(self.search_input)
+
+        self.results_list = QtWidgets.QListWidget(self)
+        self.results_list.setWordWrap(True)
+        self.results_list.itemDoubleClicked.connect(self._copy_item)
+        layout.addWidget(self.results_list)
+
+        self.status_label = QtWidgets.QLabel("", self)
+        self.status_label.setStyleSheet("color: #aaaaaa; font-size: 8pt;")
+        layout.addWidget(self.status_label)
+
+        self.setLayout(layout)
+
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.run_search)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.run_search() # Shows the newest transcripts, including those dictated since the last search
+        self.search_input.setFocus()
+
+    def _schedule_search(self):
+        self.search_timer.start()
+
+    def run_search(self):
+        query = self.search_input.text()
+        start = time.perf_counter()
+        rows = self.store.search(query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.results_list.clear()
+        for created_at, duration, text, snippet in rows:
+            timestamp = datetime.datetime.fromtimestamp(created_at).strftime("%d.%m.%Y %H:%M")
+            length = f" · {duration:.0f}s" if duration else ""
+            item = QtWidgets.QListWidgetItem(f"{timestamp}{length}\n{snippet}")
+            item.setData(QtCore.Qt.UserRole, text)
+            self.results_list.addItem(item)
+        if query.strip():
+            self.status_label.setText(f"{len(rows)} Treffer in {elapsed_ms:.1f} ms")
+        else:
+            self.status_label.setText(f"Neueste {len(rows)} Transkripte")
+
+    def _copy_item(self, item):
+        pyperclip.copy(item.data(QtCore.Qt.UserRole))
+        self.status_label.setText("✅ In die Zwischenablage kopiert.")
@@ -0,0 +1,163 @@
+import atexit
+import datetime
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from src.config import (TRANSCRIPT_DB_FILE, TRANSCRIPT_LEGACY_LOG, TRANSCRIPT_RETENTION_DAYS, TRANSCRIPT_FLUSH_SECONDS,
+                        TRANSCRIPT_BATCH_SIZE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    duration REAL,
+    latency REAL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcripts_created_at ON transcripts(created_at);
+"""
+
+# External-content FTS5 index; the triggers keep it in step with the table
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5(text, content='transcripts', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS transcripts_ai AFTER INSERT ON transcripts BEGIN
+    INSERT INTO transcripts_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS transcripts_ad AFTER DELETE ON transcripts BEGIN
+    INSERT INTO transcripts_fts(transcripts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+LEGACY_ENTRY = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?): ', re.MULTILINE)
+
+
+class TranscriptStore:
+    """Transcriptions in SQLite with a full-text index.
+
+    add() only queues the entry; a writer thread inserts queued entries in one transaction every
+    TRANSCRIPT_FLUSH_SECONDS (or as soon as TRANSCRIPT_BATCH_SIZE are waiting). Entries older than the
+    retention period are deleted when the store opens and then once a day.
+    """
+
+    def __init__(self, path=TRANSCRIPT_DB_FILE, retention_days=TRANSCRIPT_RETENTION_DAYS, flush_interval=TRANSCRIPT_FLUSH_SECONDS,
+                 batch_size=TRANSCRIPT_BATCH_SIZE, legacy_log=TRANSCRIPT_LEGACY_LOG):
+        self.path = path
+        self.retention_days = retention_days
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._last_prune = 0.0
+
+        is_new = not os.path.exists(path)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL") # Searches don't wait for a running write
+        self._connection.executescript(SCHEMA)
+        try:
+            self._connection.executescript(FTS_SCHEMA)
+            self.full_text = True
+        except sqlite3.OperationalError:
+            self.full_text = False # SQLite built without FTS5; search falls back to LIKE
+        self._connection.commit()
+        if is_new and legacy_log and os.path.exists(legacy_log):
+            self._import_legacy_log(legacy_log)
+        self._prune()
+
+        self._writer = threading.Thread(target=self._write_behind, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def add(self, text, duration=None, latency=None, created_at=None):
+        with self._lock:
+            self._pending.append((created_at or time.time(), duration, latency, text))
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if pending:
+                with self._connection:
+                    self._connection.executemany("INSERT INTO transcripts (created_at, duration, latency, text) VALUES (?, ?, ?, ?)", pending)
+        if time.time() - self._last_prune > 24 * 3600:
+            self._prune()
+
+    def _write_behind(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass # Entries of a failed batch are lost, but dictation must go on
+
+    def _prune(self):
+        self._last_prune = time.time()
+        if not self.retention_days:
+            return # Keep everything
+        cutoff = time.time() - self.retention_days * 24 * 3600
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM transcripts WHERE created_at < ?", (cutoff,))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self.flush()
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _fts_query(query):
+        # Every word must occur; the last one may still be being typed, so it matches as a prefix
+        words = [word.replace('"', '""') for word in query.split()]
+        if not words:
+            return None
+        return " ".join(f'"{word}"' for word in words[:-1]) + (" " if len(words) > 1 else "") + f'"{words[-1]}"*'
+
+    def search(self, query, limit=100):
+        """Newest matching transcripts as (created_at, duration, text, snippet) tuples."""
+        self.flush() # Include what was dictated a moment ago
+        with self._lock:
+            if not query.strip():
+                rows = self._connection.execute(
+                    "SELECT created_at, duration, text, text FROM transcripts ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+            elif self.full_text:
+                rows = self._connection.execute(
+                    "SELECT t.created_at, t.duration, t.text, snippet(transcripts_fts, 0, '»', '«', '…', 12) "
+                    "FROM transcripts_fts JOIN transcripts t ON t.id = transcripts_fts.rowid "
+                    # Rows are inserted in time order, so the newest hits are the highest rowids; ordering by the
+                    # index's own rowid lets FTS5 stop after `limit` hits instead of ranking every match
+                    "WHERE transcripts_fts MATCH ? ORDER BY transcripts_fts.rowid DESC LIMIT ?", (self._fts_query(query), limit)).fetchall()
+            else:
+                pattern = "%" + query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                rows = self._connection.execute(
+                    "SELECT created_at, duration, text, text FROM transcripts WHERE text LIKE ? ESCAPE '\\' "
+                    "ORDER BY id DESC LIMIT ?", (pattern, limit)).fetchall()
+        return rows
+
+    def count(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+
+    def _import_legacy_log(self, legacy_log):
+        """One-time import of the old transkript_log.txt, so earlier dictations stay searchable."""
+        try:
+            with open(legacy_log, "r", encoding="utf-8") as f:
+                content = f.read()
+        except OSError:
+            return
+        matches = list(LEGACY_ENTRY.finditer(content))
+        entries = []
+        for match, following in zip(matches, matches[1:] + [None]):
+            text = content[match.end():following.start() if following else len(content)].strip()
+            if text:
+                entries.append((datetime.datetime.fromisoformat(match.group(1)).timestamp(), None, None, text))
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT INTO transcripts (created_at, duration, latency, text) VALUES (?, ?, ?, ?)", entries)
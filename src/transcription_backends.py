@@ -0,0 +1,208 @@
+import importlib.util
+import os
+import threading
+import time
+
+import numpy as np
+
+from src.config import (SAMPLERATE, TRANSCRIPTION_BACKEND, TRANSCRIPTION_LANGUAGE, WHISPER_API_MODEL, WHISPER_CONNECT_TIMEOUT_SECONDS,
+                        WHISPER_READ_TIMEOUT_SECONDS, WHISPER_KEEPALIVE_SECONDS, LOCAL_WHISPER_MODEL, LOCAL_WHISPER_DEVICE,
+                        LOCAL_WHISPER_COMPUTE_TYPE, LOCAL_MAX_DURATION_SECONDS)
+from src.wav_io import open_upload
+
+
+class TranscriptionBackend:
+    """Turns int16 samples into text. Implementations must be safe to call from several threads."""
+
+    name = "base"
+
+    def is_available(self):
+        return True
+
+    def prewarm(self):
+        # Called when a recording starts; backends can use the time the user speaks to get ready
+        pass
+
+    def transcribe(self, audio_data, samplerate=SAMPLERATE):
+        raise NotImplementedError
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """Whisper API over one long-lived HTTP client with keep-alive, so requests reuse a warm connection.
+
+    openai and httpx are imported when the client is first needed, not at startup.
+    """
+
+    name = "openai"
+
+    def __init__(self, model=WHISPER_API_MODEL, language=TRANSCRIPTION_LANGUAGE, api_key=None, base_url=None):
+        self.model = model
+        self.language = language
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client = None
+        self._http_client = None
+        self._client_lock = threading.Lock()
+        self._last_used = 0.0
+
+    def is_available(self):
+        return bool(self.api_key or os.getenv("OPENAI_API_KEY"))
+
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                import httpx
+                import openai
+                try:
+                    import h2 # noqa: F401
+                    http2 = True
+                except ImportError:
+                    http2 = False # httpx needs the h2 package for HTTP/2
+                self._http_client = httpx.Client(
+                    http2=http2,
+                    timeout=httpx.Timeout(WHISPER_READ_TIMEOUT_SECONDS, connect=WHISPER_CONNECT_TIMEOUT_SECONDS),
+                    limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=WHISPER_KEEPALIVE_SECONDS),
+                )
+                self._client = openai.OpenAI(
+                    api_key=self.api_key or os.getenv("OPENAI_API_KEY"),
+                    base_url=self.base_url,
+                    http_client=self._http_client,
+                    max_retries=1,
+                )
+            return self._client
+
+    def prewarm(self):
+        """Opens the connection in the background, so DNS, TCP and TLS overlap with the user speaking."""
+        if not self.is_available() or time.monotonic() - self._last_used < WHISPER_KEEPALIVE_SECONDS / 2:
+            return # The pooled connection is most likely still alive
+        threading.Thread(target=self._prewarm, daemon=True).start()
+
+    def _prewarm(self):
+        import httpx
+        client = self._get_client()
+        try:
+            # Any cheap request establishes the connection; the response itself doesn't matter
+            self._http_client.head(str(client.base_url))
+            self._last_used = time.monotonic()
+        except httpx.HTTPError:
+            pass # The real request will surface connection problems
+
+    def transcribe(self, audio_data, samplerate=SAMPLERATE):
+        client = self._get_client()
+        # Encoded in memory; only written to disk when DEBUG_SAVE_RECORDINGS is enabled
+        with open_upload(audio_data, samplerate) as f:
+            result = client.audio.transcriptions.create(
+                model=self.model,
+                file=f,
+                response_format="text",
+                language=self.language
+            )
+        self._last_used = time.monotonic()
+        return result.strip()
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """In-process Whisper via faster-whisper. The model is loaded once and stays resident."""
+
+    name = "local"
+
+    def __init__(self, model=LOCAL_WHISPER_MODEL, device=LOCAL_WHISPER_DEVICE, compute_type=LOCAL_WHISPER_COMPUTE_TYPE,
+                 language=TRANSCRIPTION_LANGUAGE):
+        self.model_name = model
+        self.device = device
+        self.compute_type = compute_type
+        self.language = language
+        self._model = None
+        self._available = None
+        self._load_lock = threading.Lock()
+        # CTranslate2 models are not meant to be driven from several threads at once
+        self._transcribe_lock = threading.Lock()
+
+    def is_available(self):
+        if self._available is None:
+            # Only looks the package up; importing it (and CTranslate2) is left to warm_up() on its own thread
+            self._available = importlib.util.find_spec("faster_whisper") is not None
+        return self._available
+
+    def warm_up(self):
+        """Loads the model; call this ahead of time so the first dictation doesn't pay for it."""
+        with self._load_lock:
+            if self._model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError:
+                    self._available = False # Installed but broken; leave recordings to the other engines
+                    raise
+                self._model = WhisperModel(self.model_name, device=self.device, compute_type=self.compute_type)
+        return self._model
+
+    def transcribe(self, audio_data, samplerate=SAMPLERATE):
+        model = self.warm_up()
+        if samplerate != 16000:
+            raise ValueError("Lokales Whisper erwartet 16 kHz Audio.")
+        audio = audio_data.reshape(-1).astype(np.float32) / 32768.0
+        with self._transcribe_lock:
+            segments, _ = model.transcribe(audio, language=self.language, beam_size=1)
+            return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+class StubBackend(TranscriptionBackend):
+    """Offline stand-in for testing the pipeline; returns a fixed text or a description of the audio."""
+
+    name = "stub"
+
+    def __init__(self, text=None):
+        self.text = text
+        self.calls = 0
+
+    def transcribe(self, audio_data, samplerate=SAMPLERATE):
+        self.calls += 1
+        if self.text is not None:
+            return self.text
+        return f"[{len(audio_data) / samplerate:.1f}s Audio]"
+
+
+class FallbackPolicy:
+    """Decides which backend handles a recording and falls back to the next one on failure.
+
+    With "auto", short utterances go to the warm local engine first (if installed) and longer ones
+    to the OpenAI API first; either way the other engine is tried if the first one fails.
+    """
+
+    def __init__(self, backends, mode=TRANSCRIPTION_BACKEND, local_max_duration=LOCAL_MAX_DURATION_SECONDS):
+        self.backends = {backend.name: backend for backend in backends}
+        self.mode = mode
+        self.local_max_duration = local_max_duration
+
+    def candidates(self, duration):
+        if self.mode != "auto":
+            return [self.backends[self.mode]]
+        order = ["local", "openai"] if duration <= self.local_max_duration else ["openai", "local"]
+        return [self.backends[name] for name in order if name in self.backends and self.backends[name].is_available()]
+
+    def prewarm(self):
+        # A recording just started and its length is unknown yet; get every engine it may end up on ready
+        for backend in self.candidates(float("inf")):
+            backend.prewarm()
+
+    def warm_up(self):
+        # Load the local model in the background so it is resident before the first recording
+        local = self.backends.get("local")
+        if local and self.mode in ("auto", "local") and local.is_available():
+            threading.Thread(target=local.warm_up, daemon=True).start()
+
+    def transcribe(self, audio_data, samplerate=SAMPLERATE):
+        candidates = self.candidates(len(audio_data) / samplerate)
+        if not candidates:
+            raise RuntimeError("Kein Transkriptions-Backend verfügbar.")
+        last_error = None
+        for backend in candidates:
+            try:
+                return backend.transcribe(audio_data, samplerate)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+
+def create_transcription_policy(mode=TRANSCRIPTION_BACKEND):
+    return FallbackPolicy([OpenAIWhisperBackend(), LocalWhisperBackend(), StubBackend()], mode=mode)
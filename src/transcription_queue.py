@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import TRANSCRIPTION_MAX_WORKERS, TRANSCRIPTION_MAX_PENDING
+
+
+class TranscriptionScheduler:
+    """Runs transcription jobs on a bounded worker pool and delivers results in submission order.
+
+    process(*args) runs on a worker thread and returns a result (or None to skip delivery).
+    deliver(result) is called for finished jobs strictly in the order they were submitted,
+    never concurrently, so it can safely touch the clipboard and shared history.
+    """
+
+    def __init__(self, process, deliver, max_workers=TRANSCRIPTION_MAX_WORKERS, max_pending=TRANSCRIPTION_MAX_PENDING,
+                 on_depth_changed=None):
+        self._process = process
+        self._deliver = deliver
+        self._max_pending = max_pending
+        self._on_depth_changed = on_depth_changed
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcription")
+        self._lock = threading.Lock()
+        self._delivery_lock = threading.Lock()
+        self._next_sequence = 0
+        self._next_delivery = 0
+        self._finished = {} # sequence -> result, waiting for earlier jobs
+        self._pending = 0
+
+    @property
+    def depth(self):
+        return self._pending
+
+    def is_full(self):
+        return self._pending >= self._max_pending
+
+    def submit(self, *args):
+        """Queues a job; returns False without queueing it if the queue is full."""
+        with self._lock:
+            if self._pending >= self._max_pending:
+                return False
+            sequence = self._next_sequence
+            self._next_sequence += 1
+            self._pending += 1
+            depth = self._pending
+        self._notify_depth(depth)
+        self._executor.submit(self._run, sequence, args)
+        return True
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, sequence, args):
+        try:
+            result = self._process(*args)
+        except Exception:
+            result = None # process() reports its own errors; a failed job must not block later ones
+        with self._lock:
+            self._finished[sequence] = result
+        self._flush()
+
+    def _flush(self):
+        # Deliver every result whose predecessors are done; a single delivery lock keeps the order
+        with self._delivery_lock:
+            while True:
+                with self._lock:
+                    if self._next_delivery not in self._finished:
+                        return
+                    result = self._finished.pop(self._next_delivery)
+                    self._next_delivery += 1
+                    self._pending -= 1
+                    depth = self._pending
+                if result is not None:
+                    try:
+                        self._deliver(result)
+                    except Exception:
+                        pass # deliver() reports its own errors
+                self._notify_depth(depth)
+
+    def _notify_depth(self, depth):
+        if self._on_depth_changed:
+            self._on_depth_changed(depth)
@@ -7,26 +7,33 @@ project_root = os.path.abspath(os.path.join(current_dir, os.pardir))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-import datetime
-import numpy as np
+# Installed before everything else, so --profile-startup sees every import
+from src.startup_profiler import StartupProfiler, profile_step
+startup_profiler = StartupProfiler.from_argv(sys.argv)
+
+import time
 import sounddevice as sd
-import scipy.io.wavfile as wavfile
 import pyperclip
-import openai
 import winsound
 import threading
 from PyQt5 import QtWidgets, QtGui, QtCore
 import dotenv
 from pynput import keyboard
 
-from src.elevenlabs_window import ElevenLabsInputWindow
+from src import settings
+from src.audio_buffer import AudioCaptureBuffer
+from src.clipboard_history import ClipboardHistory
+from src.spectrum_feed import SpectrumFeed
 from src.status_window import StatusWindow
-from src.config import SAMPLERATE, FILENAME, ICON_PATH, MIN_RECORDING_DURATION_SECONDS, SILENCE_THRESHOLD, setup_autostart
+from src.transcript_store import TranscriptStore
+from src.streaming_transcriber import StreamingTranscriber
+from src.transcription_backends import create_transcription_policy
+from src.transcription_queue import TranscriptionScheduler
+from src.vad import contains_speech, trim_silence
+from src.config import SAMPLERATE, ICON_PATH, MIN_RECORDING_DURATION_SECONDS, STREAMING_TRANSCRIPTION, setup_autostart
 
 dotenv.load_dotenv()
 
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
 class TrayRecorder(QtWidgets.QSystemTrayIcon):
     def __init__(self, app):
         self.icon_idle = QtGui.QIcon("mic_idle.png")
@@ -34,7 +41,7 @@ class TrayRecorder(QtWidgets.QSystemTrayIcon):
         super().__init__(self.icon_idle)
         self.setToolTip("Sprachaufnahme bereit")
 
-        self.clipboard_history = ["", ""] # Stores the last two clipboard contents
+        self.clipboard_history = ClipboardHistory() # Recent transcriptions, cycled with Ctrl+Shift+V
 
         # Start global hotkey listener in a separate thread
         self.hotkey_listener_thread = threading.Thread(target=self._start_hotkey_listener, daemon=True)
@@ -42,23 +49,41 @@ class TrayRecorder(QtWidgets.QSystemTrayIcon):
 
         self.menu = QtWidgets.QMenu()
         self.menu.addAction("Fenster anzeigen", self.show_window)
+        self.menu.addAction("Spektrum anzeigen", self.open_spectral_analyzer)
+        self.menu.addAction("Transkripte durchsuchen", self.open_transcript_search)
         self.menu.addAction("Autostart aktivieren", setup_autostart)
         self.menu.addSeparator()
         self.menu.addAction("Beenden", QtWidgets.qApp.quit)
         self.setContextMenu(self.menu)
 
-        self.window = StatusWindow()
-        self.window.show()
+        with profile_step(startup_profiler, "StatusWindow"):
+            self.window = StatusWindow()
+            self.window.show()
         QtCore.QMetaObject.invokeMethod(self.window, "set_firefly_color", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(QtGui.QColor, QtGui.QColor(255, 165, 0))) # Initial orange
 
         self.is_recording = False
-        self.recording_data = []
+        self.recording_data = AudioCaptureBuffer()
+        # Live audio for the spectral analyzer; only filled while its window is open
+        self.spectrum_feed = SpectrumFeed(SAMPLERATE)
+        self.spectral_analyzer_window = None
+        # Searchable transcript history; writes are batched by its own writer thread
+        with profile_step(startup_profiler, "Transkript-Speicher"):
+            self.transcript_store = TranscriptStore()
+        self.transcript_search_window = None
         self.stream = None
+        self.streaming_transcriber = None
+        # Picks the backend per recording; loads the local model (if installed) in the background
+        with profile_step(startup_profiler, "Transkriptions-Backends"):
+            self.transcription_policy = create_transcription_policy()
+            self.transcription_policy.warm_up()
+        # Recordings are transcribed on a bounded pool and reach the clipboard in recording order
+        self.transcription_scheduler = TranscriptionScheduler(self.process_audio, self._deliver_transcription,
+                                                              on_depth_changed=self._on_queue_depth_changed)
 
         self.activated.connect(self.icon_clicked)
         
-        # Connect the Eleven Labs button
-        self.eleven_labs_input_window = ElevenLabsInputWindow()
+        # Connect the Eleven Labs button; the window itself is only built when it is first opened
+        self.eleven_labs_input_window = None
         self.window.eleven_labs_button.clicked.connect(self.open_eleven_labs_window)
 
         # Connect the new record button
@@ -108,10 +133,12 @@ class TrayRecorder(QtWidgets.QSystemTrayIcon):
             listener.join()
 
     def _paste_previous_clipboard(self):
-        if len(self.clipboard_history) > 1 and self.clipboard_history[-2]:
-            text_to_paste = self.clipboard_history[-2]
+        # Each press goes one entry further back; pressing again within a few seconds continues the cycle
+        previous = self.clipboard_history.previous()
+        if previous:
+            text_to_paste, position = previous
             pyperclip.copy(text_to_paste)
-            QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"📋 Zweitletztes kopiert:\n{text_to_paste[:60]}{'...' if len(text_to_paste) > 60 else ''}"))
+            QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"📋 Verlauf {position}/{len(self.clipboard_history)} kopiert:\n{text_to_paste[:60]}{'...' if len(text_to_paste) > 60 else ''}"))
             
             # Simulate Ctrl+V to paste the content
             keyboard.Controller().press(keyboard.Key.ctrl_l)
@@ -131,10 +158,33 @@ class TrayRecorder(QtWidgets.QSystemTrayIcon):
         self.window.activateWindow()
 
     def open_eleven_labs_window(self):
+        if self.eleven_labs_input_window is None:
+            from src.elevenlabs_window import ElevenLabsInputWindow
+            self.eleven_labs_input_window = ElevenLabsInputWindow()
+            # A paused text must not keep the process alive after quitting
+            QtWidgets.qApp.aboutToQuit.connect(self.eleven_labs_input_window.shutdown_playback)
         self.eleven_labs_input_window.show()
         self.eleven_labs_input_window.raise_()
         self.eleven_labs_input_window.activateWindow()
 
+    def open_spectral_analyzer(self):
+        if self.spectral_analyzer_window is None:
+            # pyqtgraph is only imported when the analyzer is first opened
+            from src.spectral_analyzer_widget import SpectralAnalyzerWidget
+            self.spectral_analyzer_window = SpectralAnalyzerWidget()
+            self.spectral_analyzer_window.attach_feed(self.spectrum_feed)
+        self.spectral_analyzer_window.show()
+        self.spectral_analyzer_window.raise_()
+        self.spectral_analyzer_window.activateWindow()
+
+    def open_transcript_search(self):
+        if self.transcript_search_window is None:
+            from src.transcript_search_window import TranscriptSearchWindow
+            self.transcript_search_window = TranscriptSearchWindow(self.transcript_store)
+        self.transcript_search_window.show()
+        self.transcript_search_window.raise_()
+        self.transcript_search_window.activateWindow()
+
     @QtCore.pyqtSlot()
     def toggle_recording_button(self):
         if self.is_recording:
@@ -144,6 +194,10 @@ class TrayRecorder(QtWidgets.QSystemTrayIcon):
 
     @QtCore.pyqtSlot()
     def start_recording(self):
+        if self.transcription_scheduler.is_full():
+            # Backpressure: don't record more than the queue can take
+            QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"⏳ Warteschlange voll ({self.transcription_scheduler.depth}). Bitte warten..."))
+            return
         self.setIcon(self.icon_active)
         QtCore.QMetaObject.invokeMethod(self.window, "set_firefly_color", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(QtGui.QColor, QtGui.QColor(255, 0, 0))) # Red for recording
         
@@ -163,10 +217,16 @@ class TrayRecorder(QtWidgets.QSystemTrayIcon):
         """))
 
         try:
-            self.recording_data = []
+            self.recording_data.reset()
             self.stream = sd.InputStream(samplerate=SAMPLERATE, channels=1, dtype='int16', callback=self.audio_callback)
             self.stream.start()
             self.is_recording = True
+            # Let the connection setup overlap with the user speaking
+            self.transcription_policy.prewarm()
+            if STREAMING_TRANSCRIPTION:
+                # Transcribe finished segments in the background while F3 is still held
+                self.streaming_transcriber = StreamingTranscriber(self.recording_data, self.transcription_policy.transcribe)
+                self.streaming_transcriber.start()
             winsound.Beep(1000, 120)
             QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "🎙️ Aufnahme läuft..."))
         except Exception as e:
@@ -194,7 +254,10 @@ class TrayRecorder(QtWidgets.QSystemTrayIcon):
                 self.stream.stop()
                 self.stream.close()
                 self.is_recording = False
-                self.recording_data = [] # Discard recorded data
+                if self.streaming_transcriber:
+                    self.streaming_transcriber.cancel()
+                    self.streaming_transcriber = None
+                self.recording_data.reset() # Discard recorded data
                 winsound.Beep(400, 100) # Different beep for cancellation
                 winsound.Beep(300, 100)
                 QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "🚫 Aufnahme abgebrochen."))
@@ -244,9 +307,18 @@ class TrayRecorder(QtWidgets.QSystemTrayIcon):
             winsound.Beep(800, 100)
             winsound.Beep(600, 100)
             QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "🔁 Verarbeite..."))
-            # Start processing in a new thread
-            processing_thread = threading.Thread(target=self.process_audio)
-            processing_thread.start()
+            # Stop cutting segments before the buffer is handed over
+            streaming_transcriber = self.streaming_transcriber
+            self.streaming_transcriber = None
+            if streaming_transcriber:
+                streaming_transcriber.stop()
+            # Hand the recorded segments over without copying or joining them and queue them for transcription
+            recording = self.recording_data.detach()
+            if not self.transcription_scheduler.submit(recording, streaming_transcriber):
+                if streaming_transcriber:
+                    streaming_transcriber.cancel()
+                QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "⚠️ Warteschlange voll, Aufnahme verworfen."))
+                QtCore.QMetaObject.invokeMethod(self.window, "set_firefly_color", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(QtGui.QColor, QtGui.QColor(255, 165, 0))) # Back to orange
         except Exception as e:
             QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"❌ Fehler: {e}"))
             QtCore.QMetaObject.invokeMethod(self.window, "set_firefly_color", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(QtGui.QColor, QtGui.QColor(255, 165, 0))) # Back to orange on error
@@ -254,53 +326,76 @@ class TrayRecorder(QtWidgets.QSystemTrayIcon):
     def audio_callback(self, indata, frames, time, status):
         if status:
             pass # Removed print(status)
-        self.recording_data.append(indata.copy())
+        self.recording_data.write(indata)
+        self.spectrum_feed.write(indata) # Lock-free; the analyzer polls it at its own rate
+
+    def _on_queue_depth_changed(self, depth):
+        QtCore.QMetaObject.invokeMethod(self.window, "set_queue_depth", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(int, depth))
 
-    def process_audio(self):
-        if not self.recording_data:
+    def process_audio(self, recording, streaming_transcriber=None):
+        # Runs on a worker thread of the transcription scheduler; returns (text, vad_stats, duration, latency) or None
+        if len(recording) == 0:
+            if streaming_transcriber:
+                streaming_transcriber.cancel()
             QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "⚠️ Keine Daten aufgenommen."))
-            return
-        
-        audio_data = np.concatenate(self.recording_data, axis=0)
+            return None
         
         # Calculate duration of the recording
-        duration = len(audio_data) / SAMPLERATE
+        duration = recording.duration
 
         if duration < MIN_RECORDING_DURATION_SECONDS:
+            if streaming_transcriber:
+                streaming_transcriber.cancel()
             QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"⚠️ Aufnahme zu kurz ({duration:.1f}s). Mindestens {MIN_RECORDING_DURATION_SECONDS}s benötigt."))
             QtCore.QMetaObject.invokeMethod(self.window, "set_firefly_color", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(QtGui.QColor, QtGui.QColor(255, 165, 0))) # Back to orange
-            self.recording_data = [] # Clear data for next recording
-            return
+            return None
         
-        # Check if the recording is essentially silent (empty)
-        max_amplitude = np.max(np.abs(audio_data))
-        if max_amplitude < SILENCE_THRESHOLD:
-            QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"⚠️ Aufnahme ist leer (Amplitude: {max_amplitude})."))
+        # Trim silence before upload; recordings without any speech are not sent at all
+        if streaming_transcriber:
+            # Segments are trimmed by the streaming transcriber as they are cut, so the recording is never joined
+            has_speech = any(contains_speech(segment) for segment in recording.segments())
+        else:
+            # Joined here, on the worker thread, releasing each capture segment once it is copied
+            audio_data, vad_stats = trim_silence(recording.to_array())
+            has_speech = len(audio_data) > 0
+        if not has_speech:
+            if streaming_transcriber:
+                streaming_transcriber.cancel()
+            QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, "⚠️ Aufnahme ist leer (keine Sprache erkannt)."))
             QtCore.QMetaObject.invokeMethod(self.window, "set_firefly_color", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(QtGui.QColor, QtGui.QColor(255, 165, 0))) # Back to orange
-            self.recording_data = [] # Clear data for next recording
-            return
+            return None
 
-        wavfile.write(FILENAME, SAMPLERATE, audio_data)
+        try:
+            start = time.perf_counter()
+            if streaming_transcriber:
+                # Earlier segments are already transcribed; only the tail after the last pause is left
+                text = streaming_transcriber.finish(recording)
+                vad_stats = streaming_transcriber.vad_stats
+            else:
+                text = self.transcription_policy.transcribe(audio_data)
+            # What the user waits for after releasing the hotkey
+            latency = time.perf_counter() - start
+            return text, vad_stats, duration, latency
+        except Exception as e:
+            error_message = f"❌ Transkriptionsfehler: {str(e)}" # Explicitly convert e to string
+            QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, error_message))
+            QtCore.QMetaObject.invokeMethod(self.window, "set_firefly_color", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(QtGui.QColor, QtGui.QColor(255, 165, 0))) # Back to orange on error
+            return None
 
+    def _deliver_transcription(self, result):
+        # Called by the transcription scheduler in recording order, one result at a time
+        text, vad_stats, duration, latency = result
         try:
-            with open(FILENAME, "rb") as f:
-                result = openai.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=f,
-                    response_format="text",
-                    language="de"
-                )
-            text = result.strip()
-            with open("transkript_log.txt", "a", encoding="utf-8") as logf:
-                logf.write(f"{datetime.datetime.now()}: {text}\n\n")
+            self.transcript_store.add(text, duration, latency)
 
             # Update clipboard history
-            self.clipboard_history.append(text)
-            if len(self.clipboard_history) > 2: # Keep only the last two items
-                self.clipboard_history = self.clipboard_history[-2:]
+            self.clipboard_history.add(text)
             
             pyperclip.copy(text)
-            QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"✅ Kopiert:\n{text[:60]}{'...' if len(text) > 60 else ''}"))
+            status = f"✅ Kopiert:\n{text[:60]}{'...' if len(text) > 60 else ''}"
+            if vad_stats.removed_samples:
+                status += f"\n🔇 Stille entfernt: {vad_stats.removed_seconds:.1f}s ({vad_stats.removed_bytes / 1024:.0f} KB)"
+            QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, status))
             QtCore.QMetaObject.invokeMethod(self.window, "showNormal", QtCore.Qt.QueuedConnection) # Restore if minimized
             QtCore.QMetaObject.invokeMethod(self.window, "raise", QtCore.Qt.QueuedConnection) # Bring to front
             QtCore.QMetaObject.invokeMethod(self.window, "_activate_window", QtCore.Qt.QueuedConnection) # Activate window
@@ -308,18 +403,24 @@ class TrayRecorder(QtWidgets.QSystemTrayIcon):
             QtCore.QMetaObject.invokeMethod(self.window, "set_firefly_color", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(QtGui.QColor, QtGui.QColor(0, 255, 0))) # Ensure green pulse
             QtCore.QMetaObject.invokeMethod(self.window, "set_firefly_color", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(QtGui.QColor, QtGui.QColor(255, 165, 0))) # Fade back to orange
         except Exception as e:
-            error_message = f"❌ Transkriptionsfehler: {str(e)}" # Explicitly convert e to string
-            QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, error_message))
+            QtCore.QMetaObject.invokeMethod(self.window, "set_status", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, f"❌ Fehler: {e}"))
             QtCore.QMetaObject.invokeMethod(self.window, "set_firefly_color", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(QtGui.QColor, QtGui.QColor(255, 165, 0))) # Back to orange on error
-        finally:
-            if os.path.exists(FILENAME):
-                os.remove(FILENAME)
 
 def run_app():
-    app = QtWidgets.QApplication(sys.argv)
+    with profile_step(startup_profiler, "QApplication"):
+        app = QtWidgets.QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
-    recorder = TrayRecorder(app)
-    recorder.show()
+    with profile_step(startup_profiler, "TrayRecorder"):
+        recorder = TrayRecorder(app)
+    with profile_step(startup_profiler, "Tray-Icon anzeigen"):
+        recorder.show()
+    # Hand edits to settings.json are picked up only while the tray app runs
+    settings.store.start_watching()
+    app.aboutToQuit.connect(settings.store.stop_watching)
+    if startup_profiler:
+        # Reported from the first event loop turn, i.e. once the tray is actually usable
+        startup_profiler.uninstall()
+        QtCore.QTimer.singleShot(0, startup_profiler.report)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
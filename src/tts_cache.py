@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from src.atomic_file import write_atomic
+from src.config import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES
+
+
+class TTSCache:
+    """Content-addressed LRU disk cache for synthesized TTS audio.
+
+    Entries are keyed by everything that influences the audio (voice, model, voice settings, text).
+    Recency survives restarts through the files' modification times.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES, extension=".pcm"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # key -> size, least recently used first
+        self._total_bytes = 0
+        self._load_index()
+
+    @staticmethod
+    def make_key(voice_id, model_id, voice_settings, text, output_format=None):
+        payload = json.dumps({
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "voice_settings": voice_settings,
+            "output_format": output_format,
+            "text": text,
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def _load_index(self):
+        if not os.path.isdir(self.directory):
+            return
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(self.extension):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name[:-len(self.extension)], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+                os.utime(self._path(key)) # Persist the recency for the next start
+            except OSError:
+                # Removed behind our back; treat as a miss
+                self._total_bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            write_atomic(self._path(key), data) # Readers never see a half-written entry
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._total_bytes}
@@ -0,0 +1,76 @@
+import threading
+
+import numpy as np
+
+from src.audio_buffer import AudioCaptureBuffer
+from src.config import SAMPLERATE
+
+
+class PCMStreamDecoder:
+    """Incremental decoder for raw 16-bit little-endian PCM as it arrives from the network.
+
+    HTTP chunks don't respect sample boundaries, so an odd trailing byte is kept for the next piece.
+    """
+
+    def __init__(self):
+        self._carry = b""
+
+    def decode(self, data):
+        if self._carry:
+            data = self._carry + data
+        usable = len(data) - len(data) % 2
+        self._carry = data[usable:]
+        return np.frombuffer(data[:usable], dtype="<i2").astype(np.int16, copy=False)
+
+
+class StreamedChunk:
+    """Audio of one TTS chunk that can be played while it is still being downloaded.
+
+    One producer appends decoded samples while one consumer reads them.
+    """
+
+    def __init__(self, samplerate=SAMPLERATE):
+        self._buffer = AudioCaptureBuffer(samplerate=samplerate, initial_seconds=30)
+        self._condition = threading.Condition()
+        self._finished = False
+        self.error = None
+
+    def __len__(self):
+        return len(self._buffer)
+
+    @property
+    def finished(self):
+        return self._finished
+
+    def append(self, samples):
+        if len(samples):
+            self._buffer.write(samples.reshape(-1, 1))
+            with self._condition:
+                self._condition.notify_all()
+
+    def finish(self, error=None):
+        with self._condition:
+            self.error = error
+            self._finished = True
+            self._condition.notify_all()
+
+    def wait_for_data(self, timeout=None):
+        """Blocks until the first samples arrived or the download ended."""
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self._buffer) > 0 or self._finished, timeout)
+
+    def read_next(self, position, max_frames, timeout=None):
+        """Blocks until samples after `position` are available and returns up to `max_frames` of them.
+
+        Returns an empty array once the chunk has been read to its end (or on timeout).
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: len(self._buffer) > position or self._finished, timeout)
+        end = min(position + max_frames, len(self._buffer))
+        if end <= position:
+            return np.zeros(0, dtype=np.int16)
+        return self._buffer.read(position, end).reshape(-1)
+
+    def samples(self):
+        """All samples of a finished chunk."""
+        return self._buffer.read(0, len(self._buffer)).reshape(-1)
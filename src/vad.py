@@ -0,0 +1,126 @@
+import numpy as np
+
+from src.config import (SAMPLERATE, VAD_FRAME_SECONDS, VAD_ENERGY_THRESHOLD, VAD_NOISE_FACTOR, VAD_NOISE_CEILING, VAD_LOUD_FACTOR,
+                        VAD_SPECTRAL, VAD_SPEECH_BAND_HZ, VAD_SPEECH_BAND_RATIO, VAD_MIN_SPEECH_SECONDS,
+                        VAD_PADDING_SECONDS, VAD_MAX_PAUSE_SECONDS)
+
+
+class VadStats:
+    """How much audio the VAD stage removed before upload."""
+
+    def __init__(self, removed_samples=0, samplerate=SAMPLERATE, channels=1):
+        self.removed_samples = removed_samples
+        self.samplerate = samplerate
+        self.channels = channels
+
+    def add(self, other):
+        self.removed_samples += other.removed_samples
+
+    @property
+    def removed_seconds(self):
+        return self.removed_samples / self.samplerate
+
+    @property
+    def removed_bytes(self):
+        return self.removed_samples * self.channels * 2 # int16
+
+
+def frame_length(samplerate=SAMPLERATE):
+    return max(1, int(samplerate * VAD_FRAME_SECONDS))
+
+
+def _frames(audio, length):
+    audio = audio.reshape(-1)
+    num_frames = len(audio) // length
+    return audio[:num_frames * length].reshape(num_frames, length).astype(np.float32)
+
+
+def frame_rms(audio, length):
+    """RMS energy per frame; a trailing partial frame is ignored."""
+    frames = _frames(audio, length)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def speech_frames(audio, samplerate=SAMPLERATE):
+    """Boolean speech/non-speech decision per frame."""
+    length = frame_length(samplerate)
+    frames = _frames(audio, length)
+    if len(frames) == 0:
+        return np.zeros(0, dtype=bool)
+    energy = np.mean(frames * frames, axis=1)
+    rms = np.sqrt(energy)
+
+    # Follow the noise floor of the recording, so a noisy room doesn't count as speech. The quietest
+    # frames are only noise if the recording has markedly louder ones; in continuous speech (or a
+    # streaming segment cut at pauses) they are speech too, so only the absolute threshold applies.
+    noise_floor, loud = np.percentile(rms, [10, 90])
+    threshold = VAD_ENERGY_THRESHOLD
+    if loud > noise_floor * VAD_NOISE_FACTOR:
+        threshold = max(threshold, min(noise_floor * VAD_NOISE_FACTOR, loud * VAD_NOISE_CEILING))
+    speech = rms >= threshold
+
+    if VAD_SPECTRAL and speech.any():
+        # Clicks and hum carry their energy outside the voice band
+        spectrum = np.abs(np.fft.rfft(frames[speech] * np.hanning(length), axis=1)) ** 2
+        freqs = np.fft.rfftfreq(length, 1 / samplerate)
+        band = (freqs >= VAD_SPEECH_BAND_HZ[0]) & (freqs <= VAD_SPEECH_BAND_HZ[1])
+        ratio = spectrum[:, band].sum(axis=1) / (spectrum.sum(axis=1) + 1e-9)
+        speech[speech] = ratio >= VAD_SPEECH_BAND_RATIO
+
+    if not speech.any() and loud >= VAD_ENERGY_THRESHOLD * VAD_LOUD_FACTOR:
+        # Clearly loud audio is never dropped as a whole; fall back to the absolute threshold
+        speech = rms >= VAD_ENERGY_THRESHOLD
+    return _drop_short_runs(speech, int(round(VAD_MIN_SPEECH_SECONDS / VAD_FRAME_SECONDS)))
+
+
+def _drop_short_runs(speech, min_frames):
+    """Clears runs of consecutive speech frames that are shorter than min_frames."""
+    if min_frames <= 1 or not speech.any():
+        return speech
+    padded = np.concatenate(([False], speech, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    for start, end in zip(edges[0::2], edges[1::2]):
+        if end - start < min_frames:
+            speech[start:end] = False
+    return speech
+
+
+def contains_speech(audio, samplerate=SAMPLERATE):
+    return bool(speech_frames(audio, samplerate).any())
+
+
+def trim_silence(audio, samplerate=SAMPLERATE):
+    """Trims leading/trailing silence and shortens long pauses.
+
+    Returns the trimmed audio and a VadStats. The trimmed audio is empty if no speech was found.
+    """
+    length = frame_length(samplerate)
+    speech = speech_frames(audio, samplerate)
+    channels = audio.shape[1] if audio.ndim > 1 else 1
+    if not speech.any():
+        return audio[:0], VadStats(len(audio), samplerate, channels)
+
+    # Keep a little context around speech, so word onsets and endings aren't clipped
+    padding = int(VAD_PADDING_SECONDS / VAD_FRAME_SECONDS)
+    keep = np.convolve(speech.astype(np.int32), np.ones(2 * padding + 1, dtype=np.int32), mode="same") > 0
+
+    # Collapse internal pauses to VAD_MAX_PAUSE_SECONDS, keeping half of it on either side
+    max_pause = int(VAD_MAX_PAUSE_SECONDS / VAD_FRAME_SECONDS)
+    padded = np.concatenate(([True], keep, [True]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    gap_starts, gap_ends = edges[0::2], edges[1::2]
+    for start, end in zip(gap_starts, gap_ends):
+        if start == 0 or end == len(keep):
+            continue # Leading and trailing silence are dropped entirely
+        if end - start > max_pause:
+            half = max_pause // 2
+            keep[start:start + half] = True
+            keep[end - (max_pause - half):end] = True
+        else:
+            keep[start:end] = True
+
+    mask = np.repeat(keep, length)
+    # The trailing partial frame belongs to the last frame's decision
+    mask = np.concatenate((mask, np.full(len(audio) - len(mask), keep[-1])))
+    trimmed = audio[mask]
+    return trimmed, VadStats(len(audio) - len(trimmed), samplerate, channels)
@@ -0,0 +1,67 @@
+import json
+import threading
+import time
+
+import requests
+
+from src.atomic_file import write_atomic
+from src.config import VOICE_CACHE_FILE, VOICE_CACHE_TTL_SECONDS
+
+VOICES_URL = "https://api.elevenlabs.io/v1/voices"
+
+
+class VoiceCatalog:
+    """ElevenLabs voice list persisted on disk, revalidated with an ETag once it is older than the TTL.
+
+    The cached list is available without any network access; refresh() is meant for a background thread.
+    """
+
+    def __init__(self, path=VOICE_CACHE_FILE, ttl=VOICE_CACHE_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entry = None # {"fetched_at": ..., "etag": ..., "voices": ...}, read lazily
+
+    def _load(self):
+        if self._entry is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entry = json.load(f)
+            except (OSError, ValueError):
+                self._entry = {} # Missing or corrupt; the next refresh rewrites it
+        return self._entry
+
+    def _save(self, entry):
+        write_atomic(self.path, json.dumps(entry)) # Never leave a half-written cache behind
+        self._entry = entry
+
+    def cached(self):
+        """The cached voices data, or None if nothing has been fetched yet."""
+        with self._lock:
+            return self._load().get("voices")
+
+    def is_stale(self):
+        with self._lock:
+            return time.time() - self._load().get("fetched_at", 0) > self.ttl
+
+    def refresh(self, api_key):
+        """Fetches the list if it changed on the server. Returns the new voices data, or None if unchanged."""
+        with self._lock:
+            entry = self._load()
+        headers = {
+            "Accept": "application/json",
+            "xi-api-key": api_key
+        }
+        if entry.get("etag") and entry.get("voices") is not None:
+            headers["If-None-Match"] = entry["etag"]
+        # The request runs without the lock, so the UI can keep reading the cached list meanwhile
+        response = requests.get(VOICES_URL, headers=headers, timeout=10)
+        if response.status_code == 304:
+            with self._lock:
+                self._save(dict(entry, fetched_at=time.time())) # Unchanged; only the age is reset
+            return None
+        response.raise_for_status()
+        voices_data = response.json()
+        with self._lock:
+            self._save({"fetched_at": time.time(), "etag": response.headers.get("ETag"), "voices": voices_data})
+        return voices_data if voices_data != entry.get("voices") else None
@@ -0,0 +1,35 @@
+import datetime
+import io
+import os
+
+from src.config import SAMPLERATE, FILENAME, DEBUG_SAVE_RECORDINGS
+
+
+def encode_wav(audio_data, samplerate=SAMPLERATE):
+    """Encodes the samples as WAV into memory, ready to be passed to the Whisper API."""
+    import scipy.io.wavfile as wavfile # Imported on first use; scipy is slow to import at startup
+    buffer = io.BytesIO()
+    wavfile.write(buffer, samplerate, audio_data)
+    buffer.seek(0)
+    buffer.name = FILENAME # The openai client derives the upload's file name and type from .name
+    return buffer
+
+
+def dump_wav(audio_data, samplerate=SAMPLERATE):
+    """Writes the recording to disk for debugging; every recording gets its own file."""
+    import scipy.io.wavfile as wavfile # Imported on first use, as in encode_wav
+    base, ext = os.path.splitext(FILENAME)
+    path = f"{base}_{datetime.datetime.now():%Y%m%d_%H%M%S_%f}{ext}"
+    wavfile.write(path, samplerate, audio_data)
+    return path
+
+
+def open_upload(audio_data, samplerate=SAMPLERATE, debug_save=DEBUG_SAVE_RECORDINGS):
+    """Returns a file object for the transcription upload.
+
+    By default the WAV never touches the disk. With debug_save the recording is dumped to
+    disk first and uploaded from there, so the file stays around for inspection.
+    """
+    if debug_save:
+        return open(dump_wav(audio_data, samplerate), "rb")
+    return encode_wav(audio_data, samplerate)
@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+from src.atomic_file import write_atomic
+
+
+def test_replaces_the_file_with_text_or_bytes(tmp_path):
+    path = str(tmp_path / 'data.json')
+    write_atomic(path, '{"stimme": "ä"}')
+    assert open(path, encoding='utf-8').read() == '{"stimme": "ä"}'
+    write_atomic(path, b'\x00\x01')
+    assert open(path, 'rb').read() == b'\x00\x01'
+    assert os.listdir(tmp_path) == ['data.json']
+
+
+def test_failed_write_keeps_the_old_file_and_no_temp_file(tmp_path):
+    path = str(tmp_path / 'data.json')
+    write_atomic(path, 'alt')
+    with pytest.raises(TypeError):
+        write_atomic(path, 42)
+    assert open(path).read() == 'alt'
+    assert os.listdir(tmp_path) == ['data.json']
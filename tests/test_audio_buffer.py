@@ -0,0 +1,51 @@
+import numpy as np
+
+from src.audio_buffer import AudioCaptureBuffer
+
+SAMPLES = (np.arange(50000) % 3000).astype(np.int16).reshape(-1, 1)
+
+
+def recorded_buffer(block=700):
+    buffer = AudioCaptureBuffer(samplerate=16000, initial_seconds=1) # 16000-frame segments
+    for start in range(0, len(SAMPLES), block):
+        buffer.write(SAMPLES[start:start + block])
+    return buffer
+
+
+def test_read_across_segments_while_recording():
+    buffer = recorded_buffer()
+    assert len(buffer) == len(SAMPLES)
+    assert np.array_equal(buffer.read(100, 40000), SAMPLES[100:40000])
+
+
+def test_detach_hands_over_segments_without_joining():
+    buffer = recorded_buffer()
+    recording = buffer.detach()
+    assert len(buffer) == 0
+    assert len(recording) == len(SAMPLES)
+    segments = recording.segments()
+    assert [len(segment) for segment in segments] == [16000, 16000, 16000, 2000]
+    assert np.array_equal(np.concatenate(segments), SAMPLES)
+    assert np.array_equal(recording.read(15990, len(recording)), SAMPLES[15990:])
+    assert recording.read(len(recording), len(recording)).shape == (0, 1)
+
+
+def test_to_array_joins_and_consumes():
+    recording = recorded_buffer().detach()
+    assert np.array_equal(recording.to_array(), SAMPLES)
+    assert len(recording) == 0
+
+
+def test_short_recording_is_a_view():
+    buffer = AudioCaptureBuffer(samplerate=16000, initial_seconds=1)
+    buffer.write(SAMPLES[:10])
+    audio = buffer.detach().to_array()
+    assert np.array_equal(audio, SAMPLES[:10])
+    assert audio.base is not None
+
+
+def test_buffer_is_reusable_after_detach():
+    buffer = recorded_buffer()
+    buffer.detach()
+    buffer.write(SAMPLES[:500])
+    assert np.array_equal(buffer.detach().to_array(), SAMPLES[:500])
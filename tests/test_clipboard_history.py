@@ -0,0 +1,35 @@
+from src.clipboard_history import ClipboardHistory
+
+
+def history(*texts, capacity=50):
+    clipboard = ClipboardHistory(capacity=capacity, path=None, cycle_reset=60)
+    for text in texts:
+        clipboard.add(text)
+    return clipboard
+
+
+def test_previous_cycles_through_every_entry_and_wraps():
+    clipboard = history("a", "b", "c")
+    assert [clipboard.previous() for _ in range(4)] == [("b", 2), ("a", 3), ("c", 1), ("b", 2)]
+
+
+def test_previous_with_two_entries_alternates():
+    clipboard = history("a", "b")
+    assert [clipboard.previous() for _ in range(3)] == [("a", 2), ("b", 1), ("a", 2)]
+
+
+def test_new_entry_restarts_the_cycle():
+    clipboard = history("a", "b", "c")
+    clipboard.previous()
+    clipboard.add("d")
+    assert clipboard.previous() == ("c", 2)
+
+
+def test_single_entry_has_no_previous():
+    assert history("a").previous() is None
+
+
+def test_capacity_and_duplicates():
+    clipboard = history("a", "b", "b", "c", capacity=2)
+    assert len(clipboard) == 2
+    assert clipboard.previous() == ("b", 2)
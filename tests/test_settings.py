@@ -0,0 +1,57 @@
+import json
+import os
+import threading
+import time
+
+from src.settings import SettingsStore
+
+WRITER_THREADS = 8
+
+
+def read(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def test_concurrent_writers_leave_an_intact_file(tmp_path):
+    path = str(tmp_path / 'settings.json')
+    store = SettingsStore(path, watch_interval=0)
+
+    def writer(index):
+        for i in range(200):
+            store.set(f"writer{index}", i)
+            if i % 20 == 0:
+                store.flush()
+
+    threads = [threading.Thread(target=writer, args=(index,)) for index in range(WRITER_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.flush()
+    data = read(path)
+    assert all(data[f"writer{index}"] == 199 for index in range(WRITER_THREADS))
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_burst_of_changes_is_written_after_the_debounce(tmp_path):
+    path = str(tmp_path / 'settings.json')
+    store = SettingsStore(path, save_delay=0.1, watch_interval=0)
+    for i in range(10):
+        store.set("volume", i)
+    assert not os.path.exists(path) # Nothing written while changes keep coming
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert read(path) == {"volume": 9}
+
+
+def test_unreadable_file_is_moved_aside(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text('{"elevenlabs_voice_id": ')
+    store = SettingsStore(str(path), watch_interval=0)
+    assert store.get("elevenlabs_voice_id") is None
+    assert (tmp_path / 'settings.json.bak').read_text() == '{"elevenlabs_voice_id": '
+    store.set("elevenlabs_voice_id", "voice")
+    store.flush()
+    assert read(path) == {"elevenlabs_voice_id": "voice"}
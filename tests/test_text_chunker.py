@@ -0,0 +1,79 @@
+import random
+import re
+
+import pytest
+
+from src.text_chunker import chunk_limit, split_text_into_chunks
+
+
+def without_whitespace(text):
+    return re.sub(r'\s+', '', text)
+
+
+def test_closing_quotes_and_brackets_are_kept():
+    text = 'Er sagte: "Hallo!" Dann ging er. (Wirklich.) Ende. Sie rief: »Komm!« Und „ja.“ Gut.'
+    assert " ".join(split_text_into_chunks(text)) == text
+
+
+def test_quotes_stay_with_their_sentence():
+    text = 'Er sagte: »Das ist der erste Satz.« ' + "Zweiter Satz mit mehr Inhalt. " * 6
+    chunks = split_text_into_chunks(text.strip(), first_chunk_chars=40)
+    assert chunks[0] == 'Er sagte: »Das ist der erste Satz.«'
+
+
+def test_parenthesized_sentence_is_not_split_before_bracket():
+    text = "(Das steht in Klammern.) " + "Danach kommt noch ein langer Satz. " * 5
+    chunks = split_text_into_chunks(text.strip(), first_chunk_chars=30)
+    assert chunks[0] == "(Das steht in Klammern.)"
+
+
+def test_abbreviations_do_not_end_sentences():
+    text = "Das ist z. B. bei Dr. Müller am 3. Mai so gewesen. " + "Noch ein weiterer Satz folgt hier. " * 4
+    chunks = split_text_into_chunks(text.strip(), first_chunk_chars=55)
+    assert chunks[0] == "Das ist z. B. bei Dr. Müller am 3. Mai so gewesen."
+
+
+def test_chunk_limit_ramps_up_to_maximum():
+    assert [chunk_limit(i, 100, 500, 2.0) for i in range(5)] == [100, 200, 400, 500, 500]
+    assert chunk_limit(10 ** 6, 100, 500, 2.0) == 500
+
+
+def test_chunks_respect_the_ramp():
+    text = " ".join(f"Satz Nummer {i} hat ein paar Wörter mehr als nötig." for i in range(200))
+    chunks = split_text_into_chunks(text, first_chunk_chars=100, max_chunk_chars=500, growth=2.0)
+    for index, chunk in enumerate(chunks):
+        assert len(chunk) <= chunk_limit(index, 100, 500, 2.0)
+    assert len(chunks[0]) > 50 # Not needlessly small
+    assert max(map(len, chunks)) > 400
+
+
+def test_paragraph_break_is_preferred():
+    text = "Erster Absatz mit einem Satz, der etwas länger ist.\n\nZweiter Absatz. Er geht weiter."
+    assert split_text_into_chunks(text, first_chunk_chars=80)[0] == "Erster Absatz mit einem Satz, der etwas länger ist."
+
+
+def test_overlong_sentence_is_split_at_a_clause():
+    text = "Dies ist ein sehr langer Satz ohne Punkt, der immer weiter geht; und dann noch weiter und weiter bis zum Ende."
+    chunks = split_text_into_chunks(text, first_chunk_chars=70, max_chunk_chars=70)
+    assert chunks[0] == "Dies ist ein sehr langer Satz ohne Punkt, der immer weiter geht;"
+    assert all(len(chunk) <= 70 for chunk in chunks)
+
+
+def test_word_longer_than_limit_is_cut_hard():
+    chunks = split_text_into_chunks("x" * 250, first_chunk_chars=100, max_chunk_chars=100)
+    assert chunks == ["x" * 100] * 2 + ["x" * 50]
+
+
+def test_empty_text():
+    assert split_text_into_chunks("") == []
+    assert split_text_into_chunks("  \n\n  ") == []
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_no_content_is_lost(seed):
+    rng = random.Random(seed)
+    pieces = ["Wort", "z. B.", "Dr.", "3.", "»Zitat!«", '"Frage?"', "(Klammer.)", "Ende.", "Komma,", "Strich –", "…", "\n\n", "x" * 120]
+    text = " ".join(rng.choice(pieces) for _ in range(rng.randint(1, 400)))
+    chunks = split_text_into_chunks(text, first_chunk_chars=rng.randint(20, 120), max_chunk_chars=rng.randint(120, 500))
+    assert without_whitespace("".join(chunks)) == without_whitespace(text)
+    assert all(chunk.strip() == chunk and chunk for chunk in chunks)
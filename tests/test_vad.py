@@ -0,0 +1,75 @@
+import numpy as np
+
+from src.config import SAMPLERATE, VAD_ENERGY_THRESHOLD
+from src.vad import contains_speech, speech_frames, trim_silence
+
+
+def speech_like(seconds, rng, low=0.3, high=1.0, amplitude=3000):
+    """A voiced tone whose loudness changes randomly between `low` and `high` every 100 ms, like syllables."""
+    t = np.arange(int(seconds * SAMPLERATE)) / SAMPLERATE
+    syllables = rng.uniform(low, high, int(seconds * 10) + 1)
+    envelope = syllables[(t * 10).astype(int)]
+    carrier = np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 720 * t) + 0.1 * rng.standard_normal(len(t))
+    return (amplitude * envelope * carrier).astype(np.int16)
+
+
+def silence(seconds, rng, amplitude=20):
+    return (amplitude * rng.standard_normal(int(seconds * SAMPLERATE))).astype(np.int16)
+
+
+def test_continuous_speech_is_kept():
+    rng = np.random.default_rng(0)
+    audio = speech_like(8, rng)
+    trimmed, stats = trim_silence(audio)
+    assert len(trimmed) == len(audio)
+    assert stats.removed_samples == 0
+
+
+def test_streaming_segment_without_pauses_is_kept():
+    # Segments are cut inside pauses, so they hold almost no silence
+    rng = np.random.default_rng(1)
+    audio = np.concatenate((silence(0.1, rng), speech_like(10, rng), silence(0.1, rng)))
+    trimmed, _ = trim_silence(audio)
+    assert len(trimmed) >= 10 * SAMPLERATE
+
+
+def test_loud_audio_is_never_trimmed_to_nothing():
+    rng = np.random.default_rng(2)
+    audio = speech_like(3.4, rng, low=0.9, high=1.0)
+    assert contains_speech(audio)
+    assert len(trim_silence(audio)[0]) > 0
+
+
+def test_leading_and_trailing_silence_are_trimmed():
+    rng = np.random.default_rng(3)
+    audio = np.concatenate((silence(2, rng), speech_like(2, rng), silence(2, rng)))
+    trimmed, stats = trim_silence(audio)
+    assert 2 * SAMPLERATE <= len(trimmed) < 3 * SAMPLERATE
+    assert stats.removed_seconds > 3
+
+
+def test_noisy_room_is_not_speech():
+    # Noise above the absolute threshold, with speech far above it
+    rng = np.random.default_rng(4)
+    noise = silence(3, rng, amplitude=VAD_ENERGY_THRESHOLD * 1.5)
+    audio = np.concatenate((noise, speech_like(1, rng, amplitude=12000), noise))
+    speech = speech_frames(audio)
+    frames_per_second = len(speech) / 7
+    assert not speech[:int(2.5 * frames_per_second)].any()
+    assert speech[int(3.2 * frames_per_second):int(3.8 * frames_per_second)].all()
+
+
+def test_silence_only_is_empty():
+    rng = np.random.default_rng(5)
+    audio = silence(3, rng)
+    assert not contains_speech(audio)
+    assert len(trim_silence(audio)[0]) == 0
+
+
+def test_click_in_silence_is_not_speech():
+    rng = np.random.default_rng(6)
+    audio = silence(3, rng)
+    click = int(0.005 * SAMPLERATE)
+    audio[SAMPLERATE:SAMPLERATE + click] = 20000
+    assert not contains_speech(audio)
+    assert len(trim_silence(audio)[0]) == 0